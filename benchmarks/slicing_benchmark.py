@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+"""
+Benchmark slice_transcript against the original linear-scan implementation.
+
+Builds a synthetic 8-hour transcript in the raw transcript format, checks
+that both implementations produce identical slices for several slice and
+overlap settings, and prints the time each takes.
+
+Usage:
+    python benchmarks/slicing_benchmark.py
+"""
+
+import os
+import random
+import re
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lib.audio.slicing import slice_transcript
+
+
+def legacy_slice_transcript(transcript_text: str, slice_minutes: int = 30, overlap_minutes: int = 5) -> List[Dict]:
+    """The original implementation, which rescans every timestamp for each slice."""
+    timestamp_pattern = r'\[(\d{2}):(\d{2}):(\d{2})\]'
+    matches = list(re.finditer(timestamp_pattern, transcript_text))
+
+    if not matches:
+        return [{
+            "start_time": "00:00:00",
+            "end_time": "Unknown",
+            "text": transcript_text
+        }]
+
+    slice_seconds = slice_minutes * 60
+    overlap_seconds = overlap_minutes * 60
+    step_seconds = slice_seconds - overlap_seconds
+
+    last_match = matches[-1]
+    last_hours = int(last_match.group(1))
+    last_minutes = int(last_match.group(2))
+    last_seconds = int(last_match.group(3))
+    last_total_seconds = last_hours * 3600 + last_minutes * 60 + last_seconds
+
+    slices = []
+    current_start = 0
+
+    while current_start <= last_total_seconds:
+        current_end = min(current_start + slice_seconds, last_total_seconds + 60)
+
+        start_idx = None
+        end_idx = None
+
+        for i, match in enumerate(matches):
+            hours = int(match.group(1))
+            minutes = int(match.group(2))
+            seconds = int(match.group(3))
+            total_seconds = hours * 3600 + minutes * 60 + seconds
+
+            if total_seconds >= current_start and start_idx is None:
+                start_idx = i
+
+            if total_seconds >= current_end and end_idx is None:
+                end_idx = i
+                break
+
+        if end_idx is None:
+            end_idx = len(matches) - 1
+
+        if start_idx is None:
+            start_idx = 0
+
+        if start_idx <= end_idx:
+            start_match = matches[start_idx]
+            end_match = matches[end_idx]
+
+            start_time = f"{start_match.group(1)}:{start_match.group(2)}:{start_match.group(3)}"
+            end_time = f"{end_match.group(1)}:{end_match.group(2)}:{end_match.group(3)}"
+
+            if end_idx < len(matches) - 1:
+                slice_text = transcript_text[start_match.start():matches[end_idx + 1].start()]
+            else:
+                slice_text = transcript_text[start_match.start():]
+
+            slices.append({
+                "start_time": start_time,
+                "end_time": end_time,
+                "text": slice_text
+            })
+
+        current_start += step_seconds
+
+    return slices
+
+
+def make_transcript(hours: float, seed: int = 0) -> str:
+    """
+    Build a synthetic transcript with a speaker turn every few seconds.
+
+    Files are joined with the same separator create_session_transcript
+    writes, and one file's timestamps restart slightly early to exercise
+    timestamps that go backwards.
+    """
+    rng = random.Random(seed)
+    words = ["the", "goblin", "rolls", "initiative", "and", "I", "cast", "a", "spell", "on", "it"]
+    paragraphs = []
+    current = 0.0
+    end = hours * 3600
+    file_break = end / 2
+    while current < end:
+        if file_break and current >= file_break:
+            paragraphs.append("---\n")
+            current -= 5  # An offset estimate that overshot the next file's start
+            file_break = None
+        hours_part, remainder = divmod(int(current), 3600)
+        minutes, seconds = divmod(remainder, 60)
+        text = " ".join(rng.choice(words) for _ in range(rng.randint(3, 40)))
+        paragraphs.append(f"[{hours_part:02d}:{minutes:02d}:{seconds:02d}] Speaker {rng.randint(1, 6)}: {text}\n")
+        current += rng.uniform(1.0, 12.0)
+    return "\n".join(paragraphs)
+
+
+def time_call(function, *args, repeat: int = 3) -> float:
+    """Return the best wall-clock time of several calls in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(*args)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    transcript = make_transcript(8)
+    timestamps = len(re.findall(r'\[\d{2}:\d{2}:\d{2}\]', transcript))
+    print(f"Synthetic 8-hour transcript: {len(transcript) / 1e6:.1f} MB, {timestamps} timestamps\n")
+
+    for slice_minutes, overlap_minutes in [(30, 5), (15, 5), (10, 2), (2, 1)]:
+        assert slice_transcript(transcript, slice_minutes, overlap_minutes) == \
+            legacy_slice_transcript(transcript, slice_minutes, overlap_minutes), \
+            f"Output differs for {slice_minutes}/{overlap_minutes} minute slices"
+
+        legacy = time_call(legacy_slice_transcript, transcript, slice_minutes, overlap_minutes)
+        current = time_call(slice_transcript, transcript, slice_minutes, overlap_minutes)
+        slice_count = len(slice_transcript(transcript, slice_minutes, overlap_minutes))
+        print(f"{slice_minutes:>2} min slices, {overlap_minutes} min overlap ({slice_count:>3} slices): "
+              f"legacy {legacy * 1000:8.1f} ms, current {current * 1000:6.1f} ms, "
+              f"{legacy / current:5.1f}x faster")
+
+    print("\nOutputs are identical.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python
+"""
+Speaker analytics computed from the cached word-level transcription arrays.
+
+Per-session statistics (talk time per speaker, words per minute, longest
+monologues, pause distribution and GM vs player ratio) are written to
+data/stats/<YYYY-MM-DD>.json, and a campaign-wide rollup is kept in
+data/stats/campaign.json. Only sessions whose transcript changed since their
+stats were written are recomputed.
+"""
+
+import json
+import os
+import sys
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .journal import TranscriptionJournal, get_journal_path
+from .tracks import place_track_parts
+from .word_cache import WordArrays
+from ..config import STATS_DIR, CAMPAIGN_STATS_PATH, RAW_TRANSCRIPTS_DIR
+
+# Same rule format_transcript uses to start a new paragraph
+PARAGRAPH_PAUSE_SEC = 1.5
+
+# Upper edges of the pause histogram buckets in seconds (the last bucket is open)
+PAUSE_BUCKETS_SEC = [0.5, 1.0, 2.0, 5.0, 10.0, 30.0]
+
+# Number of longest monologues to keep per session
+TOP_MONOLOGUES = 5
+
+
+def _map_times(times: np.ndarray, remap: Optional[List[Tuple[float, float, float]]]) -> np.ndarray:
+    """Map times in a silence-trimmed upload back to the original recording."""
+    if not remap:
+        return times
+    table = np.asarray(remap, dtype=np.float64)
+    index = np.clip(np.searchsorted(table[:, 0], times, side='right') - 1, 0, len(table) - 1)
+    return table[index, 1] + (times - table[index, 0])
+
+
+def _format_timestamp(seconds: float) -> str:
+    """Format seconds as HH:MM:SS like the transcript timestamps."""
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+
+def _load_session_words(journal: TranscriptionJournal) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Concatenate the spoken words of every segment in a session.
+
+    Diarized speaker IDs are only consistent within one file, so each file's
+    speakers get a "Part N Speaker M" label; M matches the numbering
+    format_transcript gives that file. The tracks of a multi-track recording
+    are labelled with their player names, which are shared across parts.
+
+    Args:
+        journal: The session's transcription journal
+
+    Returns:
+        Dictionary of parallel arrays (start, end, speaker, part) plus the
+        speaker labels, or None if a file isn't transcribed yet
+    """
+    starts, ends, speakers, parts = [], [], [], []
+    labels: List[str] = []
+    label_index: Dict[str, int] = {}
+    time_offset = 0.0
+
+    def speaker_index(label: str) -> int:
+        if label not in label_index:
+            label_index[label] = len(labels)
+            labels.append(label)
+        return label_index[label]
+
+    for part, segment in enumerate(journal.segments(), start=1):
+        loaded = []
+        for entry in segment:
+            if not journal.is_done(entry["path"]):
+                return None
+            words = WordArrays.load(entry["cache"])
+            if entry["duration"] is not None:
+                length = entry["duration"]
+            elif len(words):
+                length = float(_map_times(words.end[-1:], words.remap)[0])
+            else:
+                length = 0.0
+            loaded.append((entry, words, length))
+
+        # Tracks are placed exactly as in the transcript, split parts one after another
+        offsets, segment_end = place_track_parts(
+            [(entry.get("speaker") if entry.get("track_set") else entry["path"], length)
+             for entry, _, length in loaded])
+
+        for (entry, words, _), offset in zip(loaded, offsets):
+            # Only spoken words count; spacing and audio events don't
+            if 'word' in words.types:
+                keep = words.word_type == words.types.index('word')
+            else:
+                keep = np.zeros(len(words), dtype=bool)
+
+            if entry.get("track_set"):
+                speaker = np.full(int(keep.sum()), speaker_index(entry["speaker"]), dtype=np.int32)
+            else:
+                keep &= words.speaker >= 0
+                lookup = np.array([speaker_index(f"Part {part} Speaker {i + 1}")
+                                   for i in range(len(words.speakers))], dtype=np.int32)
+                speaker = lookup[words.speaker[keep]]
+
+            starts.append(_map_times(words.start[keep], words.remap) + time_offset + offset)
+            ends.append(_map_times(words.end[keep], words.remap) + time_offset + offset)
+            speakers.append(speaker)
+            parts.append(np.full(len(speaker), part, dtype=np.int32))
+        time_offset += segment_end
+
+    if not starts:
+        return None
+    return {
+        "start": np.concatenate(starts),
+        "end": np.concatenate(ends),
+        "speaker": np.concatenate(speakers),
+        "part": np.concatenate(parts),
+        "labels": labels,
+        "duration": time_offset
+    }
+
+
+def _runs(keys: np.ndarray, breaks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find runs of consecutive words.
+
+    Args:
+        keys: Value per word that must stay the same within a run
+        breaks: Additional per-word flags that start a new run
+
+    Returns:
+        Tuple of (index of each run's first word, index of each run's last word)
+    """
+    starts = np.flatnonzero(np.concatenate(([True], (keys[1:] != keys[:-1]) | breaks[1:])))
+    ends = np.concatenate((starts[1:] - 1, [len(keys) - 1]))
+    return starts, ends
+
+
+def compute_session_stats(date: str) -> Optional[Dict]:
+    """
+    Compute speaker statistics for a session from its cached word arrays.
+
+    Talk time is the summed length of each speaker's paragraphs (runs of words
+    without a speaker change or a pause longer than PARAGRAPH_PAUSE_SEC), so
+    pauses inside a paragraph count but silences between them don't. A
+    monologue is a run of one speaker's words until someone else speaks.
+    Diarization doesn't know who the GM is, so in each part the speaker with
+    the most talk time is taken to be the GM.
+
+    Args:
+        date: Session date (YYYY-MM-DD)
+
+    Returns:
+        Dictionary of statistics, or None if the session has no complete
+        word-level transcription
+    """
+    if not os.path.exists(get_journal_path(date)):
+        return None
+    session = _load_session_words(TranscriptionJournal(date))
+    if session is None or not len(session["start"]):
+        return None
+
+    start, end, speaker, part = session["start"], session["end"], session["speaker"], session["part"]
+    labels = session["labels"]
+    speaker_count = len(labels)
+
+    # Order by time; chunk stitching and remapping can leave small inversions
+    order = np.argsort(start, kind='stable')
+    start, end, speaker, part = start[order], end[order], speaker[order], part[order]
+
+    gaps = np.empty(len(start))
+    gaps[0] = 0.0
+    gaps[1:] = start[1:] - end[:-1]
+
+    # Paragraphs and talk time per speaker
+    para_first, para_last = _runs(speaker, gaps > PARAGRAPH_PAUSE_SEC)
+    para_length = np.maximum(end[para_last] - start[para_first], 0.0)
+    talk_time = np.bincount(speaker[para_first], weights=para_length, minlength=speaker_count)
+    word_count = np.bincount(speaker, minlength=speaker_count)
+    paragraph_count = np.bincount(speaker[para_first], minlength=speaker_count)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        wpm = np.where(talk_time > 0, word_count / (talk_time / 60.0), 0.0)
+
+    # GM is the most talkative speaker of each part
+    is_gm = np.zeros(speaker_count, dtype=bool)
+    for session_part in np.unique(part):
+        in_part = part == session_part
+        part_talk = np.bincount(speaker[para_first[in_part[para_first]]],
+                                weights=para_length[in_part[para_first]], minlength=speaker_count)
+        is_gm[np.argmax(part_talk)] = True
+    gm_time = float(talk_time[is_gm].sum())
+    player_time = float(talk_time[~is_gm].sum())
+
+    # Longest monologues
+    mono_first, mono_last = _runs(speaker, np.zeros(len(speaker), dtype=bool))
+    mono_length = end[mono_last] - start[mono_first]
+    top = np.argsort(mono_length, kind='stable')[::-1][:TOP_MONOLOGUES]
+    monologues = [
+        {
+            "speaker": labels[speaker[mono_first[i]]],
+            "start": _format_timestamp(start[mono_first[i]]),
+            "seconds": round(float(mono_length[i]), 1),
+            "words": int(mono_last[i] - mono_first[i] + 1)
+        }
+        for i in top
+    ]
+
+    # Pause distribution: silences between consecutive words, split by whether the speaker changed
+    turn_change = np.concatenate(([False], speaker[1:] != speaker[:-1]))
+    pauses = {}
+    for name, mask in (("within_speaker", ~turn_change), ("between_speakers", turn_change)):
+        values = gaps[1:][mask[1:] & (gaps[1:] > 0)]
+        edges = [0.0] + PAUSE_BUCKETS_SEC + [np.inf]
+        counts, _ = np.histogram(values, bins=edges)
+        pauses[name] = {
+            "count": int(len(values)),
+            "median_sec": round(float(np.median(values)), 2) if len(values) else 0.0,
+            "p90_sec": round(float(np.percentile(values, 90)), 2) if len(values) else 0.0,
+            "histogram": {
+                (f"<{upper:g}s" if np.isfinite(upper) else f">={lower:g}s"): int(count)
+                for lower, upper, count in zip(edges[:-1], edges[1:], counts)
+            }
+        }
+
+    speakers = []
+    for i in np.argsort(talk_time, kind='stable')[::-1]:
+        if not word_count[i]:
+            continue
+        speakers.append({
+            "speaker": labels[i],
+            "role": "GM" if is_gm[i] else "player",
+            "talk_seconds": round(float(talk_time[i]), 1),
+            "words": int(word_count[i]),
+            "paragraphs": int(paragraph_count[i]),
+            "words_per_minute": round(float(wpm[i]), 1)
+        })
+
+    total_talk = float(talk_time.sum())
+    return {
+        "date": date,
+        "duration_seconds": round(session["duration"], 1),
+        "talk_seconds": round(total_talk, 1),
+        "words": int(len(start)),
+        "words_per_minute": round(len(start) / (total_talk / 60.0), 1) if total_talk else 0.0,
+        "gm_talk_seconds": round(gm_time, 1),
+        "player_talk_seconds": round(player_time, 1),
+        "gm_to_player_ratio": round(gm_time / player_time, 2) if player_time else None,
+        "speakers": speakers,
+        "longest_monologues": monologues,
+        "pauses": pauses
+    }
+
+
+def _summarize_for_rollup(stats: Dict) -> Dict:
+    """Keep the fields of a session's stats that the campaign rollup needs."""
+    summary = {
+        key: stats[key] for key in (
+            "duration_seconds", "talk_seconds", "words", "words_per_minute",
+            "gm_talk_seconds", "player_talk_seconds", "gm_to_player_ratio"
+        )
+    }
+    monologues = stats["longest_monologues"]
+    summary["longest_monologue_seconds"] = monologues[0]["seconds"] if monologues else 0.0
+    summary["pause_histograms"] = {name: p["histogram"] for name, p in stats["pauses"].items()}
+    return summary
+
+
+def update_campaign_rollup(session_stats: List[Dict]) -> Dict:
+    """
+    Merge session statistics into the campaign-wide rollup.
+
+    Each session's summary replaces any earlier one for the same date, and
+    the totals are recomputed from the per-session summaries, so updating
+    never needs to reload older sessions' word arrays.
+
+    Args:
+        session_stats: Statistics of the sessions that changed
+
+    Returns:
+        The updated rollup
+    """
+    rollup = {"sessions": {}}
+    if os.path.exists(CAMPAIGN_STATS_PATH):
+        with open(CAMPAIGN_STATS_PATH, "r") as f:
+            rollup = json.load(f)
+
+    for stats in session_stats:
+        rollup["sessions"][stats["date"]] = _summarize_for_rollup(stats)
+    rollup["sessions"] = dict(sorted(rollup["sessions"].items()))
+
+    summaries = list(rollup["sessions"].values())
+    total_talk = sum(s["talk_seconds"] for s in summaries)
+    total_words = sum(s["words"] for s in summaries)
+    gm_time = sum(s["gm_talk_seconds"] for s in summaries)
+    player_time = sum(s["player_talk_seconds"] for s in summaries)
+
+    pause_histograms = {}
+    for summary in summaries:
+        for name, histogram in summary["pause_histograms"].items():
+            totals = pause_histograms.setdefault(name, {})
+            for bucket, count in histogram.items():
+                totals[bucket] = totals.get(bucket, 0) + count
+
+    rollup["totals"] = {
+        "sessions": len(summaries),
+        "duration_seconds": round(sum(s["duration_seconds"] for s in summaries), 1),
+        "talk_seconds": round(total_talk, 1),
+        "words": total_words,
+        "words_per_minute": round(total_words / (total_talk / 60.0), 1) if total_talk else 0.0,
+        "gm_to_player_ratio": round(gm_time / player_time, 2) if player_time else None,
+        "longest_monologue_seconds": max((s["longest_monologue_seconds"] for s in summaries), default=0.0),
+        "pause_histograms": pause_histograms
+    }
+
+    os.makedirs(os.path.dirname(CAMPAIGN_STATS_PATH), exist_ok=True)
+    temp_path = f"{CAMPAIGN_STATS_PATH}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(rollup, f, indent=2)
+    os.replace(temp_path, CAMPAIGN_STATS_PATH)
+    return rollup
+
+
+def update_all_session_stats() -> List[str]:
+    """
+    Write stats for every session whose transcript is newer than its stats.
+
+    Returns:
+        List of session dates whose stats were updated
+    """
+    if not os.path.exists(RAW_TRANSCRIPTS_DIR):
+        return []
+
+    updated = []
+    for file_name in sorted(os.listdir(RAW_TRANSCRIPTS_DIR)):
+        if not file_name.endswith(".md"):
+            continue
+        date = file_name[:-3]
+        stats_path = os.path.join(STATS_DIR, f"{date}.json")
+        transcript_path = os.path.join(RAW_TRANSCRIPTS_DIR, file_name)
+        if os.path.exists(stats_path) and os.path.getmtime(stats_path) >= os.path.getmtime(transcript_path):
+            continue
+
+        try:
+            stats = compute_session_stats(date)
+        except Exception as e:
+            print(f"Error computing speaker stats for {date}: {str(e)}", file=sys.stderr)
+            continue
+        if stats is None:
+            continue
+
+        os.makedirs(STATS_DIR, exist_ok=True)
+        with open(stats_path, "w") as f:
+            json.dump(stats, f, indent=2)
+        updated.append(stats)
+        print(f"Speaker stats for {date}: {stats['words']} words, "
+              f"GM/player talk ratio {stats['gm_to_player_ratio']}")
+
+    if updated:
+        update_campaign_rollup(updated)
+        print(f"Updated campaign speaker stats in {CAMPAIGN_STATS_PATH}")
+
+    return [stats["date"] for stats in updated]
@@ -0,0 +1,245 @@
+#!/usr/bin/env python
+"""
+Functions for transcribing a single long recording as overlapping chunks.
+The chunks are transcribed concurrently and their word streams are stitched
+back into one timeline that format_transcript can consume.
+"""
+
+import os
+import re
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from difflib import SequenceMatcher
+from types import SimpleNamespace
+from typing import Any, Dict, List, Tuple
+
+from .transcription import transcribe_audio, format_transcript, is_failed_transcription
+from .utils import get_audio_duration, extract_audio_chunk
+
+
+def plan_chunks(duration_sec: float, chunk_count: int, overlap_sec: float) -> List[Tuple[float, float]]:
+    """
+    Divide a recording into equally sized chunks that overlap their neighbours.
+
+    Args:
+        duration_sec: Total duration of the recording in seconds
+        chunk_count: Number of chunks to create
+        overlap_sec: Seconds each chunk shares with the next one
+
+    Returns:
+        List of (start_sec, length_sec) tuples
+    """
+    if chunk_count <= 1 or duration_sec <= 0:
+        return [(0.0, duration_sec)]
+
+    chunk_length = (duration_sec + (chunk_count - 1) * overlap_sec) / chunk_count
+    step = chunk_length - overlap_sec
+    if step <= 0:
+        return [(0.0, duration_sec)]
+
+    chunks = []
+    for i in range(chunk_count):
+        start = i * step
+        length = min(chunk_length, duration_sec - start)
+        chunks.append((start, length))
+    return chunks
+
+
+def _normalize_word(text: str) -> str:
+    """Normalize a word for matching across chunk edges."""
+    return re.sub(r'[^\w]', '', text.lower())
+
+
+def _shift_words(words: List[Any], offset: float) -> List[SimpleNamespace]:
+    """Copy word objects onto the recording's timeline."""
+    shifted = []
+    for word_info in words:
+        if not hasattr(word_info, 'text'):
+            continue
+        shifted.append(SimpleNamespace(
+            text=word_info.text,
+            type=getattr(word_info, 'type', 'word'),
+            speaker_id=getattr(word_info, 'speaker_id', 'unknown'),
+            start=getattr(word_info, 'start', 0) + offset,
+            end=getattr(word_info, 'end', 0) + offset
+        ))
+    return shifted
+
+
+def _map_speakers(matches: List[Tuple[SimpleNamespace, SimpleNamespace]], chunk_words: List[SimpleNamespace],
+                  used_ids: set) -> Dict[str, str]:
+    """
+    Map the speaker IDs of a new chunk onto the IDs already used in the timeline.
+
+    Args:
+        matches: Pairs of (timeline word, chunk word) aligned in the overlap
+        chunk_words: All words of the new chunk
+        used_ids: Speaker IDs already present in the timeline
+
+    Returns:
+        Dictionary mapping chunk speaker IDs to timeline speaker IDs
+    """
+    votes: Dict[Tuple[str, str], int] = {}
+    for timeline_word, chunk_word in matches:
+        pair = (chunk_word.speaker_id, timeline_word.speaker_id)
+        votes[pair] = votes.get(pair, 0) + 1
+
+    # Greedily assign the strongest one-to-one correspondences
+    speaker_map = {}
+    taken = set()
+    for (chunk_id, timeline_id), _ in sorted(votes.items(), key=lambda item: item[1], reverse=True):
+        if chunk_id in speaker_map or timeline_id in taken:
+            continue
+        speaker_map[chunk_id] = timeline_id
+        taken.add(timeline_id)
+
+    # Speakers that only appear in the new chunk get fresh IDs
+    next_number = len(used_ids)
+    for word_info in chunk_words:
+        speaker_id = word_info.speaker_id
+        if speaker_id in speaker_map or speaker_id == 'unknown':
+            continue
+        while f"speaker_{next_number}" in used_ids:
+            next_number += 1
+        speaker_map[speaker_id] = f"speaker_{next_number}"
+        used_ids.add(speaker_map[speaker_id])
+
+    return speaker_map
+
+
+def stitch_chunk_words(chunk_results: List[Tuple[float, List[Any]]], overlap_sec: float) -> List[SimpleNamespace]:
+    """
+    Stitch the word streams of overlapping chunks into one timeline.
+
+    Words in each overlap are aligned by text, speaker IDs are carried across
+    the edge from the aligned words, and the overlap is cut at an aligned
+    word so nothing is duplicated or dropped.
+
+    Args:
+        chunk_results: List of (chunk_start_sec, words) in chunk order
+        overlap_sec: Seconds each chunk shares with the next one
+
+    Returns:
+        List of word objects on the recording's timeline
+    """
+    timeline: List[SimpleNamespace] = []
+    used_ids: set = set()
+
+    for index, (chunk_start, words) in enumerate(chunk_results):
+        chunk_words = _shift_words(words, chunk_start)
+
+        if index == 0:
+            speaker_map = _map_speakers([], chunk_words, used_ids)
+            for word_info in chunk_words:
+                word_info.speaker_id = speaker_map.get(word_info.speaker_id, word_info.speaker_id)
+            timeline = chunk_words
+            continue
+
+        overlap_end = chunk_start + overlap_sec
+        timeline_overlap = [(i, w) for i, w in enumerate(timeline)
+                            if w.type == 'word' and w.start >= chunk_start]
+        chunk_overlap = [(i, w) for i, w in enumerate(chunk_words)
+                         if w.type == 'word' and w.start < overlap_end]
+
+        # Align the words both chunks heard in the overlap region
+        matcher = SequenceMatcher(
+            None,
+            [_normalize_word(w.text) for _, w in timeline_overlap],
+            [_normalize_word(w.text) for _, w in chunk_overlap],
+            autojunk=False
+        )
+        matches = []
+        for block in matcher.get_matching_blocks():
+            for k in range(block.size):
+                matches.append((timeline_overlap[block.a + k], chunk_overlap[block.b + k]))
+
+        speaker_map = _map_speakers([(a[1], b[1]) for a, b in matches], chunk_words, used_ids)
+        for word_info in chunk_words:
+            word_info.speaker_id = speaker_map.get(word_info.speaker_id, word_info.speaker_id)
+
+        if matches:
+            # Cut at the aligned word closest to the middle of the overlap
+            midpoint = chunk_start + overlap_sec / 2
+            (timeline_index, _), (chunk_index, _) = min(
+                matches, key=lambda pair: abs(pair[0][1].start - midpoint))
+            timeline = timeline[:timeline_index] + chunk_words[chunk_index:]
+        else:
+            # Nothing to align on, so fall back to cutting at the midpoint
+            midpoint = chunk_start + overlap_sec / 2
+            timeline = ([w for w in timeline if w.start < midpoint] +
+                        [w for w in chunk_words if w.start >= midpoint])
+
+    return timeline
+
+
+def transcribe_audio_chunked(file_path: str, api_key: str, chunk_count: int = 4, overlap_sec: float = 30.0,
+                             num_speakers: int = 6, max_retries: int = 1, timeout: int = 300,
+                             debug: bool = False) -> Tuple[Any, str]:
+    """
+    Transcribe one recording as overlapping chunks transcribed concurrently.
+
+    Args:
+        file_path: Path to the audio file to transcribe
+        api_key: ElevenLabs API key
+        chunk_count: Number of chunks to split the recording into
+        overlap_sec: Seconds each chunk shares with the next one
+        num_speakers: Maximum number of speakers to detect (default: 6)
+        max_retries: Maximum number of retry attempts per chunk
+        timeout: Timeout in seconds for API calls
+        debug: Enable debug mode to save raw API responses
+
+    Returns:
+        Tuple of (stitched response object, formatted transcript), or the same
+        error placeholder as transcribe_audio if any chunk failed
+    """
+    file_basename = os.path.basename(file_path)
+
+    try:
+        duration = get_audio_duration(file_path)
+    except Exception as e:
+        error_message = f"Error reading duration of {file_basename}: {str(e)}"
+        print(error_message)
+        return {"text": error_message, "words": []}, f"*{error_message}*\n\n"
+
+    chunks = plan_chunks(duration, chunk_count, overlap_sec)
+    if len(chunks) == 1:
+        return transcribe_audio(file_path, api_key, num_speakers=num_speakers, debug=debug,
+                                output_file="skip_file_output", max_retries=max_retries, timeout=timeout)
+
+    print(f"Transcribing {file_basename} as {len(chunks)} overlapping chunks...")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        base_name, file_ext = os.path.splitext(file_basename)
+        chunk_paths = []
+        try:
+            for i, (start, length) in enumerate(chunks):
+                chunk_path = os.path.join(temp_dir, f"{base_name}_chunk{i+1:02d}{file_ext}")
+                chunk_paths.append(extract_audio_chunk(file_path, start, length, chunk_path))
+        except Exception as e:
+            error_message = f"Error splitting {file_basename} into chunks: {str(e)}"
+            print(error_message)
+            return {"text": error_message, "words": []}, f"*{error_message}*\n\n"
+
+        with ThreadPoolExecutor(max_workers=len(chunk_paths)) as executor:
+            responses = list(executor.map(
+                lambda chunk_path: transcribe_audio(
+                    chunk_path, api_key, num_speakers=num_speakers, debug=debug,
+                    output_file="skip_file_output", max_retries=max_retries, timeout=timeout
+                )[0],
+                chunk_paths
+            ))
+
+    for response in responses:
+        if is_failed_transcription(response):
+            error_message = f"Error transcribing {file_basename}: {response['text']}"
+            return {"text": error_message, "words": []}, f"*{error_message}*\n\n"
+
+    words = stitch_chunk_words(
+        [(start, getattr(response, 'words', None) or []) for (start, _), response in zip(chunks, responses)],
+        overlap_sec
+    )
+    transcription = SimpleNamespace(
+        text=''.join(word_info.text for word_info in words),
+        words=words
+    )
+    return transcription, format_transcript(transcription, time_offset=0.0)
@@ -0,0 +1,202 @@
+#!/usr/bin/env python
+"""
+Rule-based cleaning of raw transcripts before they are sliced and summarized.
+
+Removes filler words ("um", "uh", ", like,"), stutters and repeated false
+starts, audio-event tags like "(laughs)", and one-word crosstalk paragraphs
+("Yeah.", "Mm-hmm."). Timestamps, speaker labels and file separators are
+kept, so cleaned transcripts slice exactly like raw ones. Cleaned text is
+cached in data/clean-transcripts/ and only rebuilt when the raw transcript
+or the rules change.
+"""
+
+import hashlib
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .slicing import estimate_tokens
+from ..config import CLEAN_TRANSCRIPTS_DIR
+
+# Bump when the rules change so cached transcripts are cleaned again
+CLEANING_VERSION = 2
+
+# "[HH:MM:SS] Speaker 1: " at the start of a paragraph
+_PREFIX_PATTERN = re.compile(r'^(\[\d{2}:\d{2}:\d{2}\] [^:\n]+: )?(.*)$')
+
+# Audio events are transcribed as lowercase tags in parentheses
+_AUDIO_EVENT_PATTERN = re.compile(r"\s*\([a-z][a-z' -]*\)")
+
+# Hesitations, with any comma or period that only punctuates them
+_FILLER_PATTERN = re.compile(r'(?<!-)\b(?:u+[hm]+|e+r+m+|h+m+|m{2,}|a+h+)\b(?!-)[,.]?', re.IGNORECASE)
+
+# Discourse markers set off by commas; "like" and "you know" elsewhere carry meaning
+_DISCOURSE_PATTERN = re.compile(r',\s*(?:like|you know|I mean),', re.IGNORECASE)
+
+# A word cut off with a hyphen before the speaker starts it over ("wh- what");
+# "twenty- or thirty-foot" doesn't start over, so it is kept
+_CUT_OFF_PATTERN = re.compile(r"\b([a-z']+)-\s+(?=\1)", re.IGNORECASE)
+
+# The same one or two words said again after a comma ("I, I, I think")
+_COMMA_REPEAT_PATTERN = re.compile(r"\b([a-z']+(?:\s+[a-z']+)?)(?:,\s+\1\b)+", re.IGNORECASE)
+
+# A short function word said twice without a pause ("the the cave"); words
+# that are grammatical when doubled ("had had", "that that") and numbers
+# ("a 20 20") are never touched
+_WORD_REPEAT_PATTERN = re.compile(r"\b([a-z']+)(?:\s+\1\b)+", re.IGNORECASE)
+_STUTTER_WORDS = {
+    "i", "i'm", "a", "an", "the", "and", "but", "to", "of", "in", "on", "at", "it", "it's",
+    "we", "we're", "you", "you're", "he", "she", "they", "my", "our", "your", "if", "or", "for", "with"
+}
+
+# Single-word paragraphs that are only crosstalk
+_BACKCHANNELS = {
+    "yeah", "yep", "yup", "okay", "ok", "right", "sure", "cool", "nice", "wow", "oh",
+    "ha", "haha", "hahaha", "hm", "hmm", "mm-hmm", "uh-huh", "alright", "mhm"
+}
+
+
+def _clean_body(body: str) -> str:
+    """Apply the cleaning rules to the text of one paragraph."""
+    capitalized = body[:1].isupper()
+    body = _AUDIO_EVENT_PATTERN.sub('', body)
+    body = _FILLER_PATTERN.sub('', body)
+    body = _DISCOURSE_PATTERN.sub(' ', body)
+    body = _CUT_OFF_PATTERN.sub('', body)
+    body = _COMMA_REPEAT_PATTERN.sub(r'\1', body)
+    body = _WORD_REPEAT_PATTERN.sub(
+        lambda m: m.group(1) if m.group(1).lower() in _STUTTER_WORDS else m.group(0), body)
+
+    # Tidy the spacing and punctuation the removals leave behind
+    body = re.sub(r'\s+', ' ', body)
+    body = re.sub(r'\s+([,.?!])', r'\1', body)
+    body = re.sub(r',+(?=[.?!])', '', body)
+    body = re.sub(r',{2,}', ',', body)
+    body = body.strip(' ,')
+    if body.startswith(('.', '?', '!')):
+        body = body.lstrip('.?! ')
+    if capitalized and body:
+        body = body[0].upper() + body[1:]
+    return body
+
+
+def _is_crosstalk(body: str) -> bool:
+    """Check whether a cleaned paragraph is empty or a lone backchannel word."""
+    words = body.lower().strip('.,?!… ').split()
+    return not words or (len(words) == 1 and words[0] in _BACKCHANNELS)
+
+
+def clean_transcript(transcript_text: str) -> str:
+    """
+    Clean a raw transcript for summarization.
+
+    Args:
+        transcript_text: Transcript in the format written by format_transcript
+
+    Returns:
+        str: The cleaned transcript, with timestamps and speaker labels kept
+    """
+    cleaned: List[str] = []
+    pending_prefix: Optional[str] = None
+
+    for line in transcript_text.split('\n'):
+        if not line.strip() or line.strip() == '---':
+            if line.strip() == '---':
+                pending_prefix = None  # Never carry a label into another file
+            cleaned.append(line)
+            continue
+
+        prefix, body = _PREFIX_PATTERN.match(line).groups()
+        body = _clean_body(body)
+        if _is_crosstalk(body):
+            # Keep the label of a dropped paragraph for the speaker's next one
+            if prefix:
+                pending_prefix = prefix
+            continue
+
+        if not prefix and pending_prefix:
+            prefix = pending_prefix
+        pending_prefix = None
+        cleaned.append(f"{prefix or ''}{body}")
+
+    # Dropped paragraphs leave runs of blank lines behind
+    return re.sub(r'\n{3,}', '\n\n', '\n'.join(cleaned)).strip('\n') + ('\n' if transcript_text.endswith('\n') else '')
+
+
+def get_clean_transcript(transcript_path: str) -> Tuple[str, Dict]:
+    """
+    Get the cleaned version of a raw transcript, cleaning it only if needed.
+
+    Args:
+        transcript_path: Path of the raw transcript (data/raw-transcripts/<date>.md)
+
+    Returns:
+        Tuple of (path of the cleaned transcript, stats dictionary with
+        tokens_before, tokens_after and whether it was cached)
+    """
+    date = os.path.basename(transcript_path).replace(".md", "")
+    clean_path = os.path.join(CLEAN_TRANSCRIPTS_DIR, f"{date}.md")
+    stats_path = os.path.join(CLEAN_TRANSCRIPTS_DIR, f"{date}.json")
+
+    with open(transcript_path, "rb") as f:
+        raw = f.read()
+    source_hash = hashlib.sha256(raw).hexdigest()
+
+    if os.path.exists(clean_path) and os.path.exists(stats_path):
+        with open(stats_path, "r") as f:
+            stats = json.load(f)
+        if stats.get("source_hash") == source_hash and stats.get("version") == CLEANING_VERSION:
+            return clean_path, dict(stats, cached=True)
+
+    raw_text = raw.decode("utf-8")
+    cleaned_text = clean_transcript(raw_text)
+    stats = {
+        "source_hash": source_hash,
+        "version": CLEANING_VERSION,
+        "tokens_before": estimate_tokens(raw_text),
+        "tokens_after": estimate_tokens(cleaned_text)
+    }
+
+    os.makedirs(CLEAN_TRANSCRIPTS_DIR, exist_ok=True)
+    temp_path = f"{clean_path}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as f:
+        f.write(cleaned_text)
+    os.replace(temp_path, clean_path)
+    with open(stats_path, "w") as f:
+        json.dump(stats, f, indent=2)
+
+    return clean_path, dict(stats, cached=False)
+
+
+def condense_context(context_text: str, max_tokens: int) -> str:
+    """
+    Condense the overlap before a slice into a short context block.
+
+    The overlap is cleaned and only its last paragraphs, the ones leading
+    into the slice, are kept within the token budget.
+
+    Args:
+        context_text: Transcript text of the overlap
+        max_tokens: Estimated token budget of the condensed context
+
+    Returns:
+        str: The condensed context, or an empty string if nothing is left
+    """
+    lines = [line for line in clean_transcript(context_text).split('\n')
+             if line.strip() and line.strip() != '---']
+
+    kept: List[str] = []
+    total = 0
+    for line in reversed(lines):
+        tokens = estimate_tokens(line)
+        if total + tokens > max_tokens:
+            if not kept:
+                # A single long turn: keep its label and the end of what was said
+                prefix, body = _PREFIX_PATTERN.match(line).groups()
+                words = body.split()
+                kept.append(f"{prefix or ''}… {' '.join(words[-max(1, max_tokens // 2):])}")
+            break
+        kept.append(line)
+        total += tokens
+    return '\n\n'.join(reversed(kept))
@@ -6,111 +6,384 @@ Functions for compiling audio file transcripts into complete session transcripts
 import os
 import sys
 import re
-from typing import List
+import shutil
+import threading
+import contextlib
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import List, Optional, TextIO
 
-from .transcription import transcribe_audio, format_transcript
-from .utils import find_unprocessed_sessions
+from .transcription import (
+    transcribe_audio,
+    write_transcript,
+    is_failed_transcription
+)
+from .chunking import transcribe_audio_chunked
+from .word_cache import WordArrays, get_word_cache_path, save_word_cache
+from .transcode import transcode_files_for_upload
+from .silence import trim_files_for_upload, report_silence_savings, make_time_map
+from .journal import TranscriptionJournal, get_journal_path, STATUS_DONE, STATUS_FAILED
+from .registry import compute_audio_hash, lookup_cached_transcription, register_transcription
+from .tracks import find_track_sets, merge_track_words, place_track_parts
+from .preflight import preflight_sessions
+from .utils import find_unprocessed_sessions, split_long_audio_file, get_audio_duration
+from ..config import TRANSCRIPTION_CACHE_DIR
 
 
-def create_session_transcript(date: str, audio_files: List[str], api_key: str, transcripts_dir: str, debug: bool = False) -> None:
+def _entry_end(entry: dict, words: WordArrays, time_map) -> float:
+    """Get how long a journaled file runs, falling back to its last word."""
+    if entry["duration"] is not None:
+        return entry["duration"]
+    if len(words):
+        last_end = float(words.end[-1])
+        return time_map(last_end) if time_map else last_end
+    return 0.0
+
+
+def _offset_time_map(time_map, offset: float):
+    """Shift a part's word times, mapped back if it was trimmed, by the part's offset in its track."""
+    if not offset:
+        return time_map
+    return lambda t: offset + (time_map(t) if time_map else t)
+
+
+def write_journal_entry(output: TextIO, entry: dict, time_offset: float) -> float:
+    """
+    Write a journaled file's cached response at a session offset.
+    
+    Words are formatted one paragraph at a time straight into the output, so
+    memory use doesn't grow with the length of the recording.
+    
+    Args:
+        output: Text file to write the formatted transcript to
+        entry: Journal entry of a file whose status is done
+        time_offset: Offset of the file within the session in seconds
+        
+    Returns:
+        float: Offset of the next file
+    """
+    words = WordArrays.load(entry["cache"])
+    time_map = make_time_map(words.remap) if words.remap else None
+    write_transcript(output, words.to_transcription(lazy=True), time_offset, time_map)
+    return time_offset + _entry_end(entry, words, time_map)
+
+
+def write_journal_segment(output: TextIO, entries: List[dict], time_offset: float) -> float:
+    """
+    Write a segment of the session: a single file, or a multi-track recording.
+    
+    The tracks of a multi-track recording are merged by timestamp and
+    labelled with the player names from their filenames. A track that was
+    split into parts is placed back on the player's timeline part by part.
+    
+    Args:
+        output: Text file to write the formatted transcript to
+        entries: Journal entries of the segment's files, all done
+        time_offset: Offset of the segment within the session in seconds
+        
+    Returns:
+        float: Offset of the next segment
+    """
+    if not entries[0].get("track_set"):
+        return write_journal_entry(output, entries[0], time_offset)
+    
+    loaded = []
+    for entry in entries:
+        words = WordArrays.load(entry["cache"])
+        time_map = make_time_map(words.remap) if words.remap else None
+        loaded.append((entry, words, time_map))
+    
+    # The parts of a split track follow each other on the player's timeline
+    offsets, segment_end = place_track_parts(
+        [(entry["speaker"], _entry_end(entry, words, time_map)) for entry, words, time_map in loaded])
+    tracks = [(entry["speaker"], words.iter_words(), _offset_time_map(time_map, offset))
+              for (entry, words, time_map), offset in zip(loaded, offsets)]
+    
+    write_transcript(output, merge_track_words(tracks), time_offset, named_speakers=True)
+    return time_offset + segment_end
+
+
+def transcribe_segment(audio_file: str, upload_file: str, cache_file: str, content_hash: str, api_key: str,
+                       debug: bool, timeout: int, retries: int, chunks_per_file: int = 1, remap=None,
+                       journal: Optional[TranscriptionJournal] = None,
+                       upload_slots: Optional[threading.Semaphore] = None, diarize: bool = True):
+    """
+    Transcribe one audio file and store the response in the word cache.
+    
+    The response is cached before any offsets are known so that a later
+    failure in the session never throws away a paid transcription.
+    
+    Args:
+        audio_file: Path to the audio file
+        upload_file: Path of the file to upload (the original or a transcoded copy)
+        cache_file: Path of the word cache file to save the response to
+        content_hash: Content hash of the audio file for the registry
+        api_key: ElevenLabs API key
+        debug: Enable debug mode
+        timeout: Timeout in seconds for API calls
+        retries: Maximum number of retry attempts for API calls
+        chunks_per_file: Number of overlapping chunks to transcribe the file as
+        remap: Remap table if silences were removed from the upload file
+        journal: Session journal to record the attempt and result in
+        upload_slots: Semaphore shared across sessions that caps concurrent uploads
+        diarize: Detect speakers; off for the single-speaker tracks of a
+            multi-track recording
+        
+    Returns:
+        The raw transcription response
+    """
+    if journal is not None:
+        journal.record_attempt(audio_file)
+    
+    with upload_slots if upload_slots is not None else contextlib.nullcontext():
+        # Chunk stitching relies on diarized speakers, so the tracks of a
+        # multi-track recording are only split into parts at the upload limit
+        if chunks_per_file > 1 and diarize:
+            transcription_data, _ = transcribe_audio_chunked(
+                upload_file,
+                api_key,
+                chunk_count=chunks_per_file,
+                max_retries=retries,
+                timeout=timeout,
+                debug=debug
+            )
+        else:
+            transcription_data, _ = transcribe_audio(
+                upload_file,
+                api_key,
+                debug=debug,
+                output_file="skip_file_output",  # Skip individual file output
+                max_retries=retries,
+                timeout=timeout,
+                diarize=diarize
+            )
+    
+    if is_failed_transcription(transcription_data):
+        raise RuntimeError(transcription_data["text"])
+    
+    save_word_cache(transcription_data, cache_file, remap)
+    register_transcription(content_hash, audio_file, cache_file)
+    if journal is not None:
+        journal.mark_done(audio_file, cache_file)
+    return transcription_data
+
+
+def create_session_transcript(date: str, audio_files: List[str], api_key: str, transcripts_dir: str, debug: bool = False,
+                              max_workers: int = 1, timeout: int = 300, retries: int = 2,
+                              chunks_per_file: int = 1, transcode: Optional[str] = None,
+                              trim_silence: bool = False,
+                              upload_slots: Optional[threading.Semaphore] = None) -> bool:
     """
     Create a single transcript from multiple audio files for a session.
     
+    Progress is tracked in the session's transcription journal. Files that
+    aren't done yet are uploaded through a pool of up to max_workers threads,
+    then every cached response is formatted in order, offset by the true
+    durations of the files before it. The tracks of a multi-track recording
+    are transcribed without diarization and merged by timestamp.
+    
     Args:
         date: Formatted date (YYYY-MM-DD)
         audio_files: List of audio file paths for the session
         api_key: ElevenLabs API key
         transcripts_dir: Directory to save transcript files
         debug: Enable debug mode
+        max_workers: Maximum number of files to transcribe concurrently
+        timeout: Timeout in seconds for API calls
+        retries: Maximum number of retry attempts per file
+        chunks_per_file: Split each file into this many overlapping chunks that
+            are transcribed concurrently and stitched back together
+        transcode: Upload codec ("opus" or "flac") to transcode files to before
+            upload, or None to upload the recordings as they are
+        trim_silence: Remove long silent stretches before upload; timestamps are
+            mapped back to the original recordings when formatting
+        upload_slots: Semaphore shared across sessions that caps concurrent uploads
+        
+    Returns:
+        bool: True if the session transcript was written, False if any file failed
     """
     # Ensure Raw Transcripts directory exists
     raw_transcripts_dir = os.path.join(transcripts_dir, "raw-transcripts")
     os.makedirs(raw_transcripts_dir, exist_ok=True)
     
-    # Create a segments directory for individual pieces
+    # Segments directory used by older runs
     segments_dir = os.path.join(raw_transcripts_dir, "segments", date)
-    os.makedirs(segments_dir, exist_ok=True)
     
     # Prepare output file path
     raw_output_path = os.path.join(raw_transcripts_dir, f"{date}.md")
     
-    # Initialize transcript content (no header)
-    transcript_content = []
+    journal = TranscriptionJournal(date)
+    
+    track_sets = find_track_sets(audio_files)
+    track_info = {path: (key, player) for key, tracks in track_sets.items() for player, path in tracks}
+    
+    # Split files over the upload limit only now that they are about to be
+    # uploaded. Every track of a recording runs the whole session, so they are
+    # all cut at the same boundaries and their parts stay in the track set.
+    upload_files = []
+    for audio_file in audio_files:
+        segment_file = os.path.join(segments_dir, f"{os.path.basename(audio_file)}.md")
+        if journal.is_done(audio_file) or os.path.exists(segment_file):
+            parts = [audio_file]
+        else:
+            parts = split_long_audio_file(audio_file)
+        if audio_file in track_info:
+            track_info.update({part: track_info[audio_file] for part in parts})
+        upload_files.extend(parts)
+    audio_files = upload_files
+    track_info = {path: track_info[path] for path in audio_files if path in track_info}
+    journal.set_files(audio_files)
+    for audio_file, (key, player) in track_info.items():
+        journal.update(audio_file, track_set=key, speaker=player)
     
-    # Process each audio file
     total_files = len(audio_files)
-    cumulative_time_offset = 0.0  # Track cumulative time across files
-    all_files_successful = True
+    cache_files = [get_word_cache_path(date, f) for f in audio_files]
+    
+    # Segment files from before the journal existed are still honoured
+    legacy_segments = {}
+    for audio_file in audio_files:
+        segment_file = os.path.join(segments_dir, f"{os.path.basename(audio_file)}.md")
+        if not journal.is_done(audio_file) and os.path.exists(segment_file):
+            legacy_segments[audio_file] = segment_file
     
+    # Record the hash and true duration of every file that still needs work
+    to_transcribe = []
     for i, audio_file in enumerate(audio_files):
-        file_basename = os.path.basename(audio_file)
-        segment_file = os.path.join(segments_dir, f"{file_basename}.md")
+        if journal.is_done(audio_file) or audio_file in legacy_segments:
+            continue
+        entry = journal.get(audio_file)
+        fields = {}
+        if not entry["content_hash"]:
+            fields["content_hash"] = compute_audio_hash(audio_file)
+        if entry["duration"] is None:
+            try:
+                fields["duration"] = get_audio_duration(audio_file)
+            except Exception as e:
+                print(f"Warning: Could not read duration of {os.path.basename(audio_file)}: {str(e)}",
+                      file=sys.stderr)
+        if fields:
+            journal.update(audio_file, **fields)
         
-        # Check if this segment already exists
-        if os.path.exists(segment_file):
-            print(f"Segment file for {file_basename} already exists, skipping transcription")
-            with open(segment_file, "r") as f:
-                segment_content = f.read()
-                
-            # Extract duration from the segment file if possible
-            duration_match = re.search(r'DURATION:(\d+\.\d+)', segment_content)
-            if duration_match:
-                file_duration = float(duration_match.group(1))
-                cumulative_time_offset += file_duration
-                
-            # Remove the metadata line before adding to transcript
-            segment_content = re.sub(r'DURATION:\d+\.\d+\n', '', segment_content)
-            transcript_content.append(segment_content)
+        # Reuse earlier transcriptions of identical audio content
+        content_hash = journal.get(audio_file)["content_hash"]
+        known_cache = lookup_cached_transcription(content_hash)
+        if known_cache:
+            print(f"{os.path.basename(audio_file)} was already transcribed, reusing {known_cache}")
+            os.makedirs(os.path.dirname(cache_files[i]), exist_ok=True)
+            if os.path.abspath(known_cache) != os.path.abspath(cache_files[i]):
+                shutil.copyfile(known_cache, cache_files[i])
+            register_transcription(content_hash, audio_file, known_cache)
+            journal.mark_done(audio_file, cache_files[i])
+        else:
+            to_transcribe.append(i)
+    
+    content_hashes = {i: journal.get(audio_files[i])["content_hash"] for i in to_transcribe}
+    
+    # Shrink the remaining files to a compact speech format before uploading
+    upload_files = {audio_files[i]: audio_files[i] for i in to_transcribe}
+    remaps = {}
+    if to_transcribe and trim_silence:
+        trim_results = trim_files_for_upload(
+            [audio_files[i] for i in to_transcribe],
+            [content_hashes[i] for i in to_transcribe]
+        )
+        report_silence_savings(date, trim_results)
+        for audio_file, (upload_path, remap) in trim_results.items():
+            upload_files[audio_file] = upload_path
+            remaps[audio_file] = remap
+    
+    # Trimmed files are already compact, so only transcode the untouched ones
+    untrimmed = [i for i in to_transcribe if not remaps.get(audio_files[i])]
+    if untrimmed and transcode:
+        upload_files.update(transcode_files_for_upload(
+            [audio_files[i] for i in untrimmed],
+            [content_hashes[i] for i in untrimmed],
+            codec=transcode
+        ))
+    
+    if to_transcribe:
+        workers = max(1, min(max_workers, len(to_transcribe)))
+        print(f"Transcribing {len(to_transcribe)} of {total_files} files with {workers} worker(s)...")
+        largest_track_set = max((len(tracks) for tracks in track_sets.values()), default=0)
+        if largest_track_set > workers:
+            print(f"Note: a multi-track recording has {largest_track_set} tracks; raise "
+                  f"--transcription-workers to upload more of them at once")
+        
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {}
+            for i in to_transcribe:
+                print(f"Queueing file {i+1}/{total_files}: {os.path.basename(audio_files[i])}")
+                future = executor.submit(transcribe_segment, audio_files[i], upload_files[audio_files[i]],
+                                         cache_files[i], content_hashes[i], api_key, debug, timeout,
+                                         retries, chunks_per_file, remaps.get(audio_files[i]), journal,
+                                         upload_slots, audio_files[i] not in track_info)
+                futures[future] = i
             
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    print(f"Error transcribing {os.path.basename(audio_files[i])}: {str(e)}", file=sys.stderr)
+                    journal.mark_failed(audio_files[i], str(e))
+                    # Don't start any uploads that haven't begun yet
+                    for other in futures:
+                        other.cancel()
+    
+    # Format the segments in file order, offsetting each by the true
+    # durations of the files before it, and write them out as we go. The
+    # transcript only replaces the raw file once every segment is in.
+    cumulative_time_offset = 0.0  # Track cumulative time across files
+    all_files_successful = True
+    temp_output_path = f"{raw_output_path}.tmp"
+    
+    # The tracks of a multi-track recording form one segment of the timeline
+    segments = []
+    track_keys = {path: key for path, (key, _) in track_info.items()}
+    for audio_file in audio_files:
+        key = track_keys.get(audio_file)
+        if key and segments and track_keys.get(segments[-1][0]) == key:
+            segments[-1].append(audio_file)
         else:
-            print(f"Processing file {i+1}/{total_files}: {file_basename}")
+            segments.append([audio_file])
+    
+    with open(temp_output_path, "w") as output:
+        for i, segment in enumerate(segments):
+            file_basename = os.path.basename(segment[0])
             
-            # Transcribe the audio file
-            try:
-                transcription_data, formatted_transcript = transcribe_audio(
-                    audio_file, 
-                    api_key, 
-                    debug=debug,
-                    output_file="skip_file_output"  # Skip individual file output
-                )
+            if segment[0] in legacy_segments:
+                print(f"Segment file for {file_basename} already exists, skipping transcription")
+                with open(legacy_segments[segment[0]], "r") as f:
+                    segment_content = f.read()
+                    
+                # Extract duration from the segment file if possible
+                duration_match = re.search(r'DURATION:(\d+\.\d+)', segment_content)
+                if duration_match:
+                    cumulative_time_offset += float(duration_match.group(1))
+                    
+                # Remove the metadata line before adding to transcript
+                output.write(re.sub(r'DURATION:\d+\.\d+\n', '', segment_content))
                 
+            elif all(journal.is_done(f) for f in segment):
                 # Format transcript with cumulative time offset
-                formatted_transcript = format_transcript(transcription_data, cumulative_time_offset)
-                
-                # Get the duration of the current file
-                file_duration = 0
-                if hasattr(transcription_data, 'words') and transcription_data.words:
-                    last_word = transcription_data.words[-1]
-                    if hasattr(last_word, 'end'):
-                        file_duration = last_word.end
-                        cumulative_time_offset += file_duration
-                
-                # Only save segment file if transcription was successful and has content
-                if formatted_transcript.strip():
-                    with open(segment_file, "w") as f:
-                        f.write(f"DURATION:{file_duration}\n")
-                        f.write(formatted_transcript)
+                cumulative_time_offset = write_journal_segment(
+                    output, [journal.get(f) for f in segment], cumulative_time_offset)
                 
-                # Add to transcript content
-                transcript_content.append(formatted_transcript)
-                    
-            except Exception as e:
-                error_msg = f"Error transcribing {file_basename}: {str(e)}"
-                print(error_msg, file=sys.stderr)
+            else:
+                for audio_file in segment:
+                    entry = journal.get(audio_file)
+                    if entry["status"] not in (STATUS_FAILED, STATUS_DONE):
+                        print(f"Transcription of {os.path.basename(audio_file)} was not started", file=sys.stderr)
                 all_files_successful = False
-                # Don't add error messages to transcript content
-                # Exit the loop if any file fails
+                # The remaining responses stay in the word cache for the next run
                 break
-        
-        # Add separation between sections
-        if i < total_files - 1:
-            transcript_content.append("\n---\n\n")
+            
+            # Add separation between sections
+            if i < len(segments) - 1:
+                output.write("\n---\n\n")
     
     # Only write the combined transcript if all files were processed successfully
     if all_files_successful:
-        # Write the combined transcript to the raw file only
-        with open(raw_output_path, "w") as f:
-            f.write("".join(transcript_content))
+        os.replace(temp_output_path, raw_output_path)
         
         print(f"\nSession transcript complete! Saved to: {raw_output_path}")
         
@@ -129,22 +402,87 @@ def create_session_transcript(date: str, audio_files: List[str], api_key: str, t
         else:
             print("\nOpenAI API key not found in environment variables. Skipping slice processing.")
             print("To process slices, set the OPENAI_API_KEY environment variable.")
+        return True
     else:
-        print("\nTranscription incomplete. Some files failed to process.")
-        print("Individual successfully transcribed segments are saved in the segments directory.")
-        print("Run the script again to retry failed segments.")
-        sys.exit(1)  # Exit with error code
+        print(f"\nTranscription of {date} incomplete. Some files failed to process.")
+        print("Successfully transcribed files are saved in the transcription cache.")
+        print("Run the script again to retry failed files.")
+        os.remove(temp_output_path)
+        return False
 
 
-def auto_process_sessions(api_key: str, debug: bool = False, timeout: int = 300, retries: int = 2) -> None:
+def reformat_transcripts_from_cache(transcripts_dir: str) -> None:
+    """
+    Rebuild all raw transcripts from the word cache.
+    
+    No API calls are made, so changes to format_transcript can be applied to
+    every cached session in seconds. Only sessions whose journal shows every
+    file as done are rebuilt.
+    
+    Args:
+        transcripts_dir: Directory containing the raw-transcripts folder
+    """
+    raw_transcripts_dir = os.path.join(transcripts_dir, "raw-transcripts")
+    os.makedirs(raw_transcripts_dir, exist_ok=True)
+    
+    if not os.path.exists(TRANSCRIPTION_CACHE_DIR):
+        print("No transcription cache found.")
+        return
+    
+    for date in sorted(os.listdir(TRANSCRIPTION_CACHE_DIR)):
+        if not os.path.exists(get_journal_path(date)):
+            continue
+        
+        journal = TranscriptionJournal(date)
+        if not journal.order:
+            continue
+        unfinished = [f for f in journal.order if not journal.is_done(f)]
+        if unfinished:
+            print(f"Skipping {date}: {len(unfinished)} file(s) have no cached response")
+            continue
+        
+        raw_output_path = os.path.join(raw_transcripts_dir, f"{date}.md")
+        temp_output_path = f"{raw_output_path}.tmp"
+        cumulative_time_offset = 0.0
+        with open(temp_output_path, "w") as output:
+            for i, segment in enumerate(journal.segments()):
+                if i:
+                    output.write("\n---\n\n")
+                cumulative_time_offset = write_journal_segment(output, segment, cumulative_time_offset)
+        os.replace(temp_output_path, raw_output_path)
+        print(f"Reformatted {date} from {len(journal.order)} cached response(s)")
+    
+    print("\nExisting slices were not regenerated; delete data/slices/<date> to re-summarize a session.")
+
+
+def auto_process_sessions(api_key: str, debug: bool = False, timeout: int = 300, retries: int = 2,
+                          max_workers: int = 1, chunks_per_file: int = 1, transcode: Optional[str] = None,
+                          trim_silence: bool = False, max_sessions: int = 1, max_uploads: int = 4,
+                          preflight: bool = True) -> List[str]:
     """
     Automatically process all unprocessed sessions.
     
+    Up to max_sessions sessions are transcribed at once, and uploads across
+    all of them are capped at max_uploads. A failing session doesn't stop the
+    others; failures are reported once every session has finished.
+    
     Args:
         api_key: ElevenLabs API key (can be None to skip audio processing)
         debug: Enable debug mode (kept for compatibility, but not used)
         timeout: Timeout in seconds for API calls
         retries: Maximum number of retry attempts for API calls
+        max_workers: Maximum number of audio files to transcribe concurrently per session
+        chunks_per_file: Number of overlapping chunks to transcribe each audio file as
+        transcode: Upload codec to transcode audio files to before upload, or None
+        trim_silence: Remove long silent stretches from audio files before upload
+        max_sessions: Maximum number of sessions to transcribe concurrently
+        max_uploads: Maximum number of files uploading at once across all sessions
+            (a file transcribed as chunks holds one slot for all its chunks)
+        preflight: Check the files locally first and hold back sessions with
+            unreadable, mostly-silent or wrongly-dated files
+        
+    Returns:
+        List of session dates that failed to transcribe
     """
     # Set up paths
     base_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -156,18 +494,49 @@ def auto_process_sessions(api_key: str, debug: bool = False, timeout: int = 300,
     # Check if API key is provided
     if api_key is None:
         print("ElevenLabs API key not provided. Skipping audio transcription.")
-        return
+        return []
         
     # Find unprocessed sessions
     unprocessed_sessions = find_unprocessed_sessions(audio_dir, transcripts_dir)
     
     if not unprocessed_sessions:
         print("No unprocessed sessions found.")
-        return
+        return []
     
     print(f"Found {len(unprocessed_sessions)} unprocessed sessions.\n")
     
-    # Process each session
-    for date, files in unprocessed_sessions.items():
+    if preflight:
+        unprocessed_sessions = preflight_sessions(unprocessed_sessions)
+        print()
+        if not unprocessed_sessions:
+            return []
+    
+    upload_slots = threading.BoundedSemaphore(max(1, max_uploads))
+    
+    def process_session(date: str, files: List[str]) -> bool:
         print(f"Processing session from {date} ({len(files)} files)...")
-        create_session_transcript(date, files, api_key, transcripts_dir, debug)
+        return create_session_transcript(date, files, api_key, transcripts_dir, debug,
+                                         max_workers=max_workers, timeout=timeout, retries=retries,
+                                         chunks_per_file=chunks_per_file, transcode=transcode,
+                                         trim_silence=trim_silence, upload_slots=upload_slots)
+    
+    # Process the sessions, keeping each one's failure to itself
+    failed_sessions = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_sessions)) as executor:
+        futures = {executor.submit(process_session, date, files): date
+                   for date, files in sorted(unprocessed_sessions.items())}
+        for future in as_completed(futures):
+            date = futures[future]
+            try:
+                if not future.result():
+                    failed_sessions[date] = "some files failed to transcribe"
+            except Exception as e:
+                failed_sessions[date] = str(e)
+    
+    if failed_sessions:
+        print(f"\n{len(failed_sessions)} of {len(unprocessed_sessions)} sessions failed to transcribe:")
+        for date in sorted(failed_sessions):
+            print(f"  {date}: {failed_sessions[date]}")
+        print("Run the script again to retry them.")
+    
+    return sorted(failed_sessions)
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""
+Per-session transcription journal.
+
+Records each audio file's content hash, true duration, status, attempt count
+and cached response location so that resuming, retrying and concurrent
+workers all run off one small JSON file.
+"""
+
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from ..config import TRANSCRIPTION_CACHE_DIR
+
+# Status values for journal entries
+STATUS_PENDING = "pending"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+def get_journal_path(date: str) -> str:
+    """
+    Get the journal path for a session.
+
+    Args:
+        date: Session date (YYYY-MM-DD)
+
+    Returns:
+        str: Path of the session's journal file
+    """
+    return os.path.join(TRANSCRIPTION_CACHE_DIR, date, "journal.json")
+
+
+class TranscriptionJournal:
+    """Thread-safe record of the transcription state of one session's audio files."""
+
+    def __init__(self, date: str):
+        self.date = date
+        self.path = get_journal_path(date)
+        self._lock = threading.Lock()
+        self.files: Dict[str, Dict] = {}
+        self.order: List[str] = []
+
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.files = data.get("files", {})
+            self.order = data.get("order", [])
+
+    def _save(self) -> None:
+        """Write the journal through a temporary file. Callers hold the lock."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({"date": self.date, "order": self.order, "files": self.files}, f, indent=2)
+        os.replace(temp_path, self.path)
+
+    def get(self, audio_file: str) -> Optional[Dict]:
+        """
+        Get the journal entry for an audio file.
+
+        Args:
+            audio_file: Path or name of the audio file
+
+        Returns:
+            The entry dictionary, or None if the file isn't in the journal
+        """
+        with self._lock:
+            entry = self.files.get(os.path.basename(audio_file))
+            return dict(entry) if entry else None
+
+    def is_done(self, audio_file: str) -> bool:
+        """Check whether an audio file has a finished, cached transcription."""
+        entry = self.get(audio_file)
+        return bool(entry and entry["status"] == STATUS_DONE and entry.get("cache")
+                    and os.path.exists(entry["cache"]))
+
+    @staticmethod
+    def _new_entry(audio_file: str) -> Dict:
+        """Create the entry for a file that hasn't been worked on yet."""
+        return {
+            "path": audio_file,
+            "content_hash": None,
+            "duration": None,
+            "status": STATUS_PENDING,
+            "attempts": 0,
+            "cache": None,
+            "error": None
+        }
+
+    def set_files(self, audio_files: List[str]) -> None:
+        """
+        Record the session's files in transcription order.
+
+        Args:
+            audio_files: Paths of the session's audio files, in order
+        """
+        with self._lock:
+            self.order = [os.path.basename(f) for f in audio_files]
+            for audio_file in audio_files:
+                self.files.setdefault(os.path.basename(audio_file), self._new_entry(audio_file))
+            self._save()
+
+    def add_file(self, audio_file: str) -> None:
+        """
+        Append a file to the end of the session, e.g. a newly recorded chunk.
+
+        Args:
+            audio_file: Path of the audio file
+        """
+        with self._lock:
+            file_name = os.path.basename(audio_file)
+            if file_name not in self.order:
+                self.order.append(file_name)
+            self.files.setdefault(file_name, self._new_entry(audio_file))
+            self._save()
+
+    def segments(self) -> List[List[Dict]]:
+        """
+        Group the session's entries into the segments that make up its timeline.
+
+        A segment is either a single file or the tracks of a multi-track
+        recording, which play at the same time.
+
+        Returns:
+            List of segments in order, each a list of entries
+        """
+        with self._lock:
+            segments: List[List[Dict]] = []
+            for file_name in self.order:
+                entry = dict(self.files[file_name])
+                track_set = entry.get("track_set")
+                if track_set and segments and segments[-1][0].get("track_set") == track_set:
+                    segments[-1].append(entry)
+                else:
+                    segments.append([entry])
+            return segments
+
+    def update(self, audio_file: str, **fields) -> None:
+        """
+        Update fields of an audio file's entry.
+
+        Args:
+            audio_file: Path or name of the audio file
+            **fields: Entry fields to set
+        """
+        with self._lock:
+            self.files[os.path.basename(audio_file)].update(fields)
+            self._save()
+
+    def record_attempt(self, audio_file: str) -> None:
+        """Count an upload attempt for an audio file."""
+        with self._lock:
+            entry = self.files[os.path.basename(audio_file)]
+            entry["attempts"] += 1
+            entry["status"] = STATUS_PENDING
+            self._save()
+
+    def mark_done(self, audio_file: str, cache_path: str) -> None:
+        """Record that an audio file's response is in the word cache."""
+        self.update(audio_file, status=STATUS_DONE, cache=cache_path, error=None)
+
+    def mark_failed(self, audio_file: str, error: str) -> None:
+        """Record that an audio file failed to transcribe."""
+        self.update(audio_file, status=STATUS_FAILED, error=error)
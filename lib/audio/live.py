@@ -0,0 +1,230 @@
+#!/usr/bin/env python
+"""
+Near-real-time transcription of a session while it is being played.
+
+Rolling recording chunks (5-10 minutes each) are picked up from
+audio/live/<YYYY-MM-DD>/ as soon as they are complete, transcribed, and
+appended to the session's raw transcript using the same journal and offset
+logic as create_session_transcript.
+"""
+
+import os
+import shutil
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+
+from .compilation import transcribe_segment, write_journal_entry
+from .journal import TranscriptionJournal
+from .registry import compute_audio_hash, lookup_cached_transcription, register_transcription
+from .utils import get_audio_duration
+from .word_cache import get_word_cache_path
+from ..config import AUDIO_DIR
+
+# Recording formats picked up from the live directory
+LIVE_AUDIO_EXTENSIONS = ('.mp3', '.ogg', '.opus', '.flac', '.m4a', '.wav')
+
+
+def get_live_chunk_dir(date: str) -> str:
+    """
+    Get the directory rolling recording chunks for a session are written to.
+
+    Args:
+        date: Session date (YYYY-MM-DD)
+
+    Returns:
+        str: Path of the session's live chunk directory
+    """
+    return os.path.join(AUDIO_DIR, "live", date)
+
+
+def _list_chunks(chunk_dir: str) -> List[str]:
+    """List the recording chunks in a directory in recording order."""
+    if not os.path.exists(chunk_dir):
+        return []
+    return sorted(
+        os.path.join(chunk_dir, f) for f in os.listdir(chunk_dir)
+        if f.lower().endswith(LIVE_AUDIO_EXTENSIONS) and not f.startswith('.')
+    )
+
+
+def _rebuild_partial_transcript(journal: TranscriptionJournal, partial_path: str) -> Tuple[float, int]:
+    """
+    Rewrite the partial transcript from every chunk the journal has finished.
+
+    Args:
+        journal: The session's transcription journal
+        partial_path: Path of the partial transcript
+
+    Returns:
+        Tuple of (offset of the next chunk, number of chunks written)
+    """
+    time_offset = 0.0
+    written = 0
+    with open(partial_path, "w") as f:
+        for file_name in journal.order:
+            if not journal.is_done(file_name):
+                break
+            if written:
+                f.write("\n---\n\n")
+            time_offset = write_journal_entry(f, journal.get(file_name), time_offset)
+            written += 1
+    return time_offset, written
+
+
+def _transcribe_chunk(chunk_path: str, date: str, journal: TranscriptionJournal, api_key: str,
+                      timeout: int, retries: int) -> None:
+    """
+    Transcribe one completed chunk into the word cache and journal.
+
+    Args:
+        chunk_path: Path of the recording chunk
+        date: Session date (YYYY-MM-DD)
+        journal: The session's transcription journal
+        api_key: ElevenLabs API key
+        timeout: Timeout in seconds for API calls
+        retries: Maximum number of retry attempts for API calls
+    """
+    journal.add_file(chunk_path)
+    entry = journal.get(chunk_path)
+    fields = {}
+    if not entry["content_hash"]:
+        fields["content_hash"] = compute_audio_hash(chunk_path)
+    if entry["duration"] is None:
+        fields["duration"] = get_audio_duration(chunk_path)
+    if fields:
+        journal.update(chunk_path, **fields)
+
+    content_hash = journal.get(chunk_path)["content_hash"]
+    cache_file = get_word_cache_path(date, chunk_path)
+    known_cache = lookup_cached_transcription(content_hash)
+    if known_cache:
+        os.makedirs(os.path.dirname(cache_file), exist_ok=True)
+        if os.path.abspath(known_cache) != os.path.abspath(cache_file):
+            shutil.copyfile(known_cache, cache_file)
+        register_transcription(content_hash, chunk_path, known_cache)
+        journal.mark_done(chunk_path, cache_file)
+        return
+
+    transcribe_segment(chunk_path, chunk_path, cache_file, content_hash, api_key,
+                       debug=False, timeout=timeout, retries=retries, journal=journal)
+
+
+def watch_live_session(date: str, api_key: str, transcripts_dir: str, chunk_dir: Optional[str] = None,
+                       poll_interval: float = 10.0, settle_seconds: float = 30.0,
+                       idle_timeout: float = 1800.0, timeout: int = 300, retries: int = 2) -> bool:
+    """
+    Transcribe a session's recording chunks as they arrive.
+
+    A chunk counts as complete once a later chunk exists or it hasn't changed
+    for settle_seconds. Completed chunks are transcribed in order and appended
+    to raw-transcripts/<date>.md.partial, which is renamed to <date>.md when
+    the session ends: after idle_timeout seconds without a new chunk, or on
+    Ctrl+C. At that point any remaining chunk is transcribed as well.
+
+    Setting ELEVENLABS_BASE_URL points the uploads at a local stand-in for
+    the speech-to-text endpoint.
+
+    Args:
+        date: Session date (YYYY-MM-DD)
+        api_key: ElevenLabs API key
+        transcripts_dir: Directory containing the raw-transcripts folder
+        chunk_dir: Directory to watch (default: audio/live/<date>)
+        poll_interval: Seconds between directory scans
+        settle_seconds: Seconds a chunk must stay unchanged to count as complete
+        idle_timeout: Seconds without a new chunk before the session is finished
+        timeout: Timeout in seconds for API calls
+        retries: Maximum number of retry attempts per chunk
+
+    Returns:
+        bool: True if the final transcript was written
+    """
+    chunk_dir = chunk_dir or get_live_chunk_dir(date)
+    raw_transcripts_dir = os.path.join(transcripts_dir, "raw-transcripts")
+    os.makedirs(raw_transcripts_dir, exist_ok=True)
+    os.makedirs(chunk_dir, exist_ok=True)
+    raw_output_path = os.path.join(raw_transcripts_dir, f"{date}.md")
+    partial_path = f"{raw_output_path}.partial"
+
+    if os.path.exists(raw_output_path):
+        print(f"Transcript for {date} already exists at {raw_output_path}")
+        return True
+
+    # Pick up where a previous run left off
+    journal = TranscriptionJournal(date)
+    time_offset, written = _rebuild_partial_transcript(journal, partial_path)
+    if written:
+        print(f"Resuming live session {date} after {written} transcribed chunk(s)")
+
+    print(f"Watching {chunk_dir} for recording chunks (Ctrl+C to finish the session)...")
+
+    last_seen: Dict[str, Tuple[int, float, float]] = {}  # path -> (size, mtime, first seen unchanged)
+    last_activity = time.time()
+    finishing = False
+
+    while True:
+        try:
+            chunks = _list_chunks(chunk_dir)
+            now = time.time()
+
+            # Work out which chunks are complete, in recording order
+            ready = []
+            for index, chunk_path in enumerate(chunks):
+                if journal.is_done(chunk_path):
+                    continue
+                stat = os.stat(chunk_path)
+                signature = (stat.st_size, stat.st_mtime)
+                previous = last_seen.get(chunk_path)
+                if previous is None or previous[:2] != signature:
+                    last_seen[chunk_path] = (*signature, now)
+                    last_activity = now
+                    previous = last_seen[chunk_path]
+
+                later_chunk_exists = index < len(chunks) - 1
+                settled = now - previous[2] >= settle_seconds
+                if finishing or later_chunk_exists or settled:
+                    ready.append(chunk_path)
+                else:
+                    break  # Keep chunks in order behind the one still recording
+
+            for chunk_path in ready:
+                print(f"Transcribing chunk {os.path.basename(chunk_path)}...")
+                try:
+                    _transcribe_chunk(chunk_path, date, journal, api_key, timeout, retries)
+                except Exception as e:
+                    print(f"Error transcribing {os.path.basename(chunk_path)}: {str(e)}", file=sys.stderr)
+                    journal.mark_failed(chunk_path, str(e))
+                    break  # Retry this chunk on the next scan so the order is kept
+
+                with open(partial_path, "a") as f:
+                    if written:
+                        f.write("\n---\n\n")
+                    time_offset = write_journal_entry(f, journal.get(chunk_path), time_offset)
+                written += 1
+                last_activity = time.time()
+                print(f"Appended {os.path.basename(chunk_path)} to {partial_path}")
+
+            if finishing:
+                break
+            if now - last_activity >= idle_timeout:
+                print(f"No new audio for {int(idle_timeout // 60)} minutes, finishing the session...")
+                finishing = True
+                continue
+
+            time.sleep(poll_interval)
+
+        except KeyboardInterrupt:
+            if finishing:
+                raise
+            print("\nFinishing the live session...")
+            finishing = True
+
+    pending = [c for c in _list_chunks(chunk_dir) if not journal.is_done(c)]
+    if pending or not written:
+        print(f"\nLive session {date} is incomplete: {len(pending)} chunk(s) not transcribed.")
+        print("Run live mode again to retry them.")
+        return False
+
+    os.replace(partial_path, raw_output_path)
+    print(f"\nSession transcript complete! Saved to: {raw_output_path}")
+    return True
@@ -0,0 +1,222 @@
+#!/usr/bin/env python
+"""
+Local preflight checks of recordings before they are uploaded for transcription.
+
+Each file's duration is read from its headers and a handful of short windows
+spread over the recording are decoded to measure their RMS energy. Files that
+can't be read, stop early, are mostly silent or carry an impossible date are
+flagged before any API call, and their sessions are held back.
+"""
+
+import datetime
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from .registry import compute_audio_hash, lookup_cached_transcription
+from .tracks import find_track_sets
+from .utils import batched_duration_writes, extract_date_from_filename, get_audio_duration
+
+# Number of windows decoded per file and their length in seconds
+PREFLIGHT_WINDOWS = 12
+PREFLIGHT_WINDOW_SEC = 2.0
+
+# A window quieter than this RMS level counts as silent
+SILENT_WINDOW_DBFS = -50.0
+
+# A file is mostly silent when at least this share of its windows is silent
+MOSTLY_SILENT_SHARE = 0.9
+
+# Sample rate windows are decoded at; plenty for an energy estimate
+_DECODE_SAMPLE_RATE = 8000
+
+
+def _format_duration(seconds: Optional[float]) -> str:
+    """Format seconds as H:MM:SS for the report."""
+    if seconds is None:
+        return "?:??:??"
+    hours, remainder = divmod(int(seconds), 3600)
+    minutes, secs = divmod(remainder, 60)
+    return f"{hours}:{minutes:02d}:{secs:02d}"
+
+
+def _window_rms_dbfs(audio_path: str, start_sec: float, length_sec: float) -> Optional[float]:
+    """
+    Decode a short window of a recording and measure its RMS level.
+
+    Args:
+        audio_path: Path to the audio file
+        start_sec: Start of the window in seconds
+        length_sec: Length of the window in seconds
+
+    Returns:
+        RMS level in dBFS, or None if less than half the window could be decoded
+    """
+    result = subprocess.run(
+        ["ffmpeg", "-v", "error", "-nostdin",
+         "-ss", f"{start_sec:.3f}", "-t", f"{length_sec:.3f}",
+         "-i", audio_path,
+         "-map", "0:a:0", "-ac", "1", "-ar", str(_DECODE_SAMPLE_RATE),
+         "-f", "s16le", "-"],
+        capture_output=True
+    )
+    samples = np.frombuffer(result.stdout, dtype=np.int16)
+    if result.returncode != 0 or len(samples) < length_sec * _DECODE_SAMPLE_RATE / 2:
+        return None
+    rms = np.sqrt(np.mean(samples.astype(np.float64) ** 2)) / 32768.0
+    return float(20 * np.log10(max(rms, 1e-10)))
+
+
+def _check_date(audio_path: str) -> Optional[str]:
+    """Describe what is wrong with a file's date, or None if it is plausible."""
+    try:
+        _, formatted_date = extract_date_from_filename(audio_path)
+        recorded = datetime.date.fromisoformat(formatted_date)
+    except ValueError:
+        return "filename date is not a valid date"
+
+    if recorded > datetime.date.today():
+        return f"filename date {recorded} is in the future"
+
+    # A recording can't have been written before the day it was made
+    modified = datetime.date.fromtimestamp(os.path.getmtime(audio_path))
+    if modified < recorded:
+        return f"filename date {recorded} is after the file was last modified ({modified})"
+    return None
+
+
+def check_audio_file(audio_path: str, allow_silence: bool = False) -> Dict:
+    """
+    Run the preflight checks on one recording.
+
+    Args:
+        audio_path: Path to the audio file
+        allow_silence: Don't treat a mostly-silent file as a problem (the
+            per-player tracks of a multi-track recording are mostly silence)
+
+    Returns:
+        Dictionary with the path, duration (None if unreadable), whether the
+        transcription is already cached, the share of silent windows, and
+        lists of problems and warnings
+    """
+    report = {"path": audio_path, "duration": None, "cached": False,
+              "silent_share": None, "problems": [], "warnings": []}
+
+    date_problem = _check_date(audio_path)
+    if date_problem:
+        report["problems"].append(date_problem)
+
+    if os.path.getsize(audio_path) == 0:
+        report["problems"].append("file is empty")
+        return report
+
+    try:
+        duration = get_audio_duration(audio_path)
+    except Exception as e:
+        report["problems"].append(f"unreadable: {str(e).strip() or type(e).__name__}")
+        return report
+    report["duration"] = duration
+    if duration <= 0:
+        report["problems"].append("headers report no audio")
+        return report
+
+    # Content that was transcribed before is reused, not uploaded
+    if lookup_cached_transcription(compute_audio_hash(audio_path)):
+        report["cached"] = True
+        return report
+
+    # Spread the windows evenly, with the last one at the very end to catch truncation
+    window = min(PREFLIGHT_WINDOW_SEC, duration)
+    last_start = max(0.0, duration - window - 0.5)
+    starts = np.linspace(0.0, last_start, num=PREFLIGHT_WINDOWS if last_start > 0 else 1)
+
+    levels = []
+    for start in starts:
+        level = _window_rms_dbfs(audio_path, float(start), window)
+        if level is None:
+            report["problems"].append(f"could not be decoded at {_format_duration(start)} "
+                                      f"(truncated or corrupt)")
+            return report
+        levels.append(level)
+
+    silent_share = sum(level < SILENT_WINDOW_DBFS for level in levels) / len(levels)
+    report["silent_share"] = silent_share
+    if silent_share >= MOSTLY_SILENT_SHARE:
+        message = f"mostly silent ({silent_share:.0%} of sampled windows below {SILENT_WINDOW_DBFS:g} dBFS)"
+        if allow_silence:
+            report["warnings"].append(message)
+        else:
+            report["problems"].append(message)
+
+    return report
+
+
+def preflight_sessions(sessions: Dict[str, List[str]], max_workers: Optional[int] = None) -> Dict[str, List[str]]:
+    """
+    Check every file of the given sessions and print a report.
+
+    A session with any problem file is held back so that it isn't
+    transcribed (and marked processed) without it; fix or remove the file
+    and run again.
+
+    Args:
+        sessions: Dictionary mapping session dates to their audio files
+        max_workers: Maximum number of files checked at once (default: number of CPUs)
+
+    Returns:
+        The sessions that passed, mapped to their audio files
+    """
+    if not sessions:
+        return {}
+
+    track_files = {
+        path
+        for files in sessions.values()
+        for tracks in find_track_sets(files).values()
+        for _, path in tracks
+    }
+
+    all_files = [f for date in sorted(sessions) for f in sessions[date]]
+    workers = max_workers or os.cpu_count() or 1
+    # The duration cache is written once for the whole pool, not once per file
+    with batched_duration_writes(), ThreadPoolExecutor(max_workers=workers) as executor:
+        reports = dict(zip(all_files, executor.map(
+            lambda f: check_audio_file(f, allow_silence=f in track_files), all_files)))
+
+    print(f"Preflight check of {len(all_files)} files in {len(sessions)} sessions:")
+    passed = {}
+    upload_count = 0
+    upload_seconds = 0.0
+    for date in sorted(sessions):
+        files = sessions[date]
+        held_back = any(reports[f]["problems"] for f in files)
+        print(f"\n  {date}{'  HELD BACK' if held_back else ''}")
+
+        for audio_file in files:
+            report = reports[audio_file]
+            if report["problems"]:
+                status = "PROBLEM: " + "; ".join(report["problems"])
+            elif report["cached"]:
+                status = "already transcribed, reused"
+            else:
+                status = "send"
+            if report["warnings"]:
+                status += " (" + "; ".join(report["warnings"]) + ")"
+            print(f"    {os.path.basename(audio_file):<40} {_format_duration(report['duration']):>9}  {status}")
+
+        if not held_back:
+            passed[date] = files
+            to_send = [reports[f] for f in files if not reports[f]["cached"]]
+            upload_count += len(to_send)
+            upload_seconds += sum(r["duration"] for r in to_send)
+
+    held_back_count = len(sessions) - len(passed)
+    print(f"\nWill send {upload_count} files ({_format_duration(upload_seconds)} of audio) "
+          f"from {len(passed)} sessions")
+    if held_back_count:
+        print(f"{held_back_count} sessions held back; fix or remove the flagged files and run again.")
+
+    return passed
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""
+Token-bucket rate limiting for concurrent API requests.
+
+One limiter is shared by every request of a run, so requests per minute and
+tokens per minute stay under the account's limits however many requests are
+in flight.
+"""
+
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucketLimiter:
+    """Asyncio limiter on requests per minute and estimated tokens per minute."""
+
+    def __init__(self, requests_per_minute: Optional[int] = None, tokens_per_minute: Optional[int] = None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        # Buckets start full, so a run can open with a burst up to the limits
+        self._requests = float(requests_per_minute or 0)
+        self._tokens = float(tokens_per_minute or 0)
+        self._updated = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _refill(self) -> None:
+        """Add the capacity that accrued since the last refill."""
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        if self.requests_per_minute:
+            self._requests = min(self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60)
+        if self.tokens_per_minute:
+            self._tokens = min(self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60)
+
+    def _wait_time(self, tokens: float) -> float:
+        """Seconds until both buckets hold enough for a request of this size."""
+        wait = 0.0
+        if self.requests_per_minute and self._requests < 1:
+            wait = max(wait, (1 - self._requests) * 60 / self.requests_per_minute)
+        if self.tokens_per_minute and self._tokens < tokens:
+            wait = max(wait, (tokens - self._tokens) * 60 / self.tokens_per_minute)
+        return wait
+
+    async def acquire(self, tokens: int = 0) -> None:
+        """
+        Wait until a request of the given size fits within both limits, then take its share.
+
+        Requests are admitted in the order they ask, so a large request isn't
+        starved by smaller ones.
+
+        Args:
+            tokens: Estimated tokens of the request (prompt plus expected output)
+        """
+        if self.tokens_per_minute:
+            # A request larger than a whole minute's budget waits for a full bucket
+            tokens = min(tokens, self.tokens_per_minute)
+
+        # A run's slices all share one summarizer's event loop, but a limiter
+        # handed to several summarizers is used from each one's own loop, and
+        # an asyncio lock only works on the loop it was first used on
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._lock = asyncio.Lock()
+            self._loop = loop
+
+        async with self._lock:
+            while True:
+                self._refill()
+                wait = self._wait_time(tokens)
+                if wait <= 0:
+                    break
+                await asyncio.sleep(wait)
+            if self.requests_per_minute:
+                self._requests -= 1
+            if self.tokens_per_minute:
+                self._tokens -= tokens
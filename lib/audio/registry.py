@@ -0,0 +1,176 @@
+#!/usr/bin/env python
+"""
+Registry of audio content hashes mapped to cached transcription results.
+Lets renamed, re-exported or duplicated recordings reuse an earlier
+transcription instead of being uploaded again.
+"""
+
+import hashlib
+import json
+import os
+import threading
+from typing import Dict, Optional
+
+from ..config import AUDIO_REGISTRY_PATH
+
+# Bytes read from the start, middle and end of large files
+HASH_SAMPLE_SIZE = 1024 * 1024
+
+_registry_lock = threading.Lock()
+
+
+def load_registry() -> Dict[str, Dict]:
+    """
+    Load the registry, treating a missing or corrupt file as empty.
+
+    A scan of many files loads it once, passes it to compute_audio_hash and
+    lookup_cached_transcription, and writes its new hashes back once with
+    save_file_hashes.
+
+    Returns:
+        The registry with its hashes and files tables
+    """
+    registry = {}
+    if os.path.exists(AUDIO_REGISTRY_PATH):
+        try:
+            with open(AUDIO_REGISTRY_PATH, "r") as f:
+                registry = json.load(f)
+        except (OSError, ValueError):
+            registry = {}
+    registry.setdefault("hashes", {})
+    registry.setdefault("files", {})
+    return registry
+
+
+def _save_registry(registry: Dict[str, Dict]) -> None:
+    """Write the registry through a temporary file."""
+    temp_path = f"{AUDIO_REGISTRY_PATH}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(registry, f, indent=2)
+    os.replace(temp_path, AUDIO_REGISTRY_PATH)
+
+
+def save_file_hashes(registry: Dict[str, Dict]) -> None:
+    """
+    Write the file hashes of a loaded registry back to disk, if any are new.
+
+    The hashes are merged into the registry as it is on disk now, so
+    transcriptions registered since it was loaded are kept.
+
+    Args:
+        registry: Registry from load_registry
+    """
+    with _registry_lock:
+        current = load_registry()
+        if all(current["files"].get(key) == entry for key, entry in registry["files"].items()):
+            return
+        current["files"].update(registry["files"])
+        _save_registry(current)
+
+
+def _hash_file_contents(audio_path: str) -> str:
+    """
+    Hash an audio file, sampling large files instead of reading them fully.
+
+    Files larger than three samples are hashed from their size plus the
+    first, middle and last HASH_SAMPLE_SIZE bytes.
+
+    Args:
+        audio_path: Path to the audio file
+
+    Returns:
+        str: Hex digest of the content hash
+    """
+    size = os.path.getsize(audio_path)
+    digest = hashlib.sha256(str(size).encode())
+
+    with open(audio_path, "rb") as f:
+        if size <= 3 * HASH_SAMPLE_SIZE:
+            digest.update(f.read())
+        else:
+            for offset in (0, size // 2 - HASH_SAMPLE_SIZE // 2, size - HASH_SAMPLE_SIZE):
+                f.seek(offset)
+                digest.update(f.read(HASH_SAMPLE_SIZE))
+
+    return digest.hexdigest()
+
+
+def compute_audio_hash(audio_path: str, registry: Optional[Dict[str, Dict]] = None) -> str:
+    """
+    Get the content hash of an audio file.
+
+    Hashes are remembered by path, size and modification time so repeated
+    scans don't read the files again.
+
+    Args:
+        audio_path: Path to the audio file
+        registry: Registry loaded for a scan of many files; a new hash is
+            only added to it, to be saved with save_file_hashes
+
+    Returns:
+        str: Hex digest of the content hash
+    """
+    stat = os.stat(audio_path)
+    file_key = os.path.abspath(audio_path)
+
+    if registry is None:
+        with _registry_lock:
+            entry = load_registry()["files"].get(file_key)
+    else:
+        entry = registry["files"].get(file_key)
+    if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+        return entry["hash"]
+
+    content_hash = _hash_file_contents(audio_path)
+    file_entry = {"size": stat.st_size, "mtime": stat.st_mtime, "hash": content_hash}
+
+    if registry is not None:
+        registry["files"][file_key] = file_entry
+        return content_hash
+
+    with _registry_lock:
+        registry = load_registry()
+        registry["files"][file_key] = file_entry
+        _save_registry(registry)
+
+    return content_hash
+
+
+def lookup_cached_transcription(content_hash: str, registry: Optional[Dict[str, Dict]] = None) -> Optional[str]:
+    """
+    Find a cached transcription for audio content seen before.
+
+    Args:
+        content_hash: Content hash of the audio file
+        registry: Registry already loaded for a scan, instead of reading it again
+
+    Returns:
+        str: Path of the cached word arrays, or None if the content is unknown
+    """
+    if registry is None:
+        with _registry_lock:
+            registry = load_registry()
+    entry = registry["hashes"].get(content_hash)
+    if entry and os.path.exists(entry["cache"]):
+        return entry["cache"]
+    return None
+
+
+def register_transcription(content_hash: str, audio_path: str, cache_path: str) -> None:
+    """
+    Record that audio content has been transcribed into a cache file.
+
+    Args:
+        content_hash: Content hash of the audio file
+        audio_path: Path of the audio file that was transcribed
+        cache_path: Path of the cached word arrays
+    """
+    with _registry_lock:
+        registry = load_registry()
+        entry = registry["hashes"].setdefault(content_hash, {"cache": cache_path, "files": []})
+        if not os.path.exists(entry["cache"]):
+            entry["cache"] = cache_path
+        file_name = os.path.basename(audio_path)
+        if file_name not in entry["files"]:
+            entry["files"].append(file_name)
+        _save_registry(registry)
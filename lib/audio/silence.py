@@ -0,0 +1,249 @@
+#!/usr/bin/env python
+"""
+Functions for removing long silent stretches from recordings before upload.
+A remap table records where each kept stretch sat in the original recording
+so transcript timestamps can be mapped back to it.
+"""
+
+import json
+import os
+import re
+import subprocess
+import sys
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ..config import UPLOAD_CACHE_DIR
+from .transcode import UPLOAD_SAMPLE_RATE
+from .utils import get_audio_duration
+
+# Silence detection defaults: quieter than this for at least this long is a break
+SILENCE_NOISE_DB = -40
+SILENCE_MIN_SEC = 30.0
+
+# Seconds of each silent stretch left in place so word edges aren't clipped
+SILENCE_PADDING_SEC = 1.0
+
+
+def detect_silences(audio_path: str, noise_db: int = SILENCE_NOISE_DB,
+                    min_silence_sec: float = SILENCE_MIN_SEC) -> List[Tuple[float, Optional[float]]]:
+    """
+    Find long silent stretches with ffmpeg's energy-based silencedetect filter.
+
+    The audio is decoded as a stream, so memory use doesn't depend on length.
+
+    Args:
+        audio_path: Path to the audio file
+        noise_db: Level in dB below which audio counts as silence
+        min_silence_sec: Minimum length of a silent stretch in seconds
+
+    Returns:
+        List of (start_sec, end_sec) tuples; end_sec is None for a silence
+        that runs to the end of the file
+    """
+    result = subprocess.run(
+        ["ffmpeg", "-v", "info", "-nostats",
+         "-i", audio_path,
+         "-map", "0:a:0", "-ac", "1",
+         "-af", f"silencedetect=noise={noise_db}dB:d={min_silence_sec}",
+         "-f", "null", "-"],
+        capture_output=True, text=True, check=True
+    )
+
+    silences = []
+    current_start = None
+    for line in result.stderr.splitlines():
+        start_match = re.search(r'silence_start: (-?[\d.]+)', line)
+        if start_match:
+            current_start = max(0.0, float(start_match.group(1)))
+            continue
+        end_match = re.search(r'silence_end: ([\d.]+)', line)
+        if end_match and current_start is not None:
+            silences.append((current_start, float(end_match.group(1))))
+            current_start = None
+
+    if current_start is not None:
+        silences.append((current_start, None))
+
+    return silences
+
+
+def build_remap(silences: List[Tuple[float, Optional[float]]], duration_sec: float,
+                padding_sec: float = SILENCE_PADDING_SEC) -> List[Tuple[float, float, float]]:
+    """
+    Work out which stretches to keep and where they land in the trimmed file.
+
+    Args:
+        silences: Silent stretches from detect_silences
+        duration_sec: Duration of the original recording
+        padding_sec: Seconds of each silence to keep on both sides
+
+    Returns:
+        Remap table of (trimmed_start, original_start, length) rows
+    """
+    remap = []
+    kept_start = 0.0
+    trimmed_position = 0.0
+
+    for silence_start, silence_end in silences:
+        silence_end = duration_sec if silence_end is None else silence_end
+        cut_start = silence_start + padding_sec
+        cut_end = silence_end - padding_sec
+        if cut_end <= cut_start:
+            continue
+        if cut_start > kept_start:
+            remap.append((trimmed_position, kept_start, cut_start - kept_start))
+            trimmed_position += cut_start - kept_start
+        kept_start = cut_end
+
+    if duration_sec > kept_start:
+        remap.append((trimmed_position, kept_start, duration_sec - kept_start))
+
+    return remap
+
+
+def make_time_map(remap: List[Tuple[float, float, float]]) -> Callable[[float], float]:
+    """
+    Build a function mapping times in a trimmed file back to the original.
+
+    Args:
+        remap: Remap table of (trimmed_start, original_start, length) rows
+
+    Returns:
+        Function taking a trimmed time in seconds and returning the original time
+    """
+    trimmed_starts = [row[0] for row in remap]
+
+    def time_map(trimmed_time: float) -> float:
+        index = max(0, bisect_right(trimmed_starts, trimmed_time) - 1)
+        trimmed_start, original_start, _ = remap[index]
+        return original_start + (trimmed_time - trimmed_start)
+
+    return time_map
+
+
+def _save_remap(remap_path: str, remap: List[Tuple[float, float, float]]) -> None:
+    """Write a remap table to the upload cache through a temporary file."""
+    os.makedirs(UPLOAD_CACHE_DIR, exist_ok=True)
+    temp_path = f"{remap_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(remap, f)
+    os.replace(temp_path, remap_path)
+
+
+def trim_silence(audio_path: str, content_hash: str, noise_db: int = SILENCE_NOISE_DB,
+                 min_silence_sec: float = SILENCE_MIN_SEC) -> Tuple[str, Optional[List[Tuple[float, float, float]]]]:
+    """
+    Write a copy of a recording with its long silences removed.
+
+    The trimmed copy is mono 16 kHz Opus, cached by content hash and detection
+    settings together with its remap table. A recording with nothing to
+    remove is cached as an empty table, so it isn't decoded again.
+
+    Args:
+        audio_path: Path to the original recording
+        content_hash: Content hash of the original recording, used in the cache key
+        noise_db: Level in dB below which audio counts as silence
+        min_silence_sec: Minimum length of a silent stretch in seconds
+
+    Returns:
+        Tuple of (path to upload, remap table); the remap table is None and
+        the original path is returned when there was nothing to remove
+    """
+    # Trims made with other detection settings cut different stretches
+    cache_key = f"{content_hash}.trimmed.{noise_db:g}dB-{min_silence_sec:g}s-{SILENCE_PADDING_SEC:g}s"
+    output_path = os.path.join(UPLOAD_CACHE_DIR, f"{cache_key}.ogg")
+    remap_path = os.path.join(UPLOAD_CACHE_DIR, f"{cache_key}.json")
+    if os.path.exists(remap_path):
+        with open(remap_path, "r") as f:
+            remap = [tuple(row) for row in json.load(f)]
+        # An empty table records that there was nothing to remove
+        if not remap:
+            return audio_path, None
+        if os.path.exists(output_path):
+            return output_path, remap
+
+    duration = get_audio_duration(audio_path)
+    remap = build_remap(detect_silences(audio_path, noise_db, min_silence_sec), duration)
+    if len(remap) == 1 and remap[0][1] == 0.0 and remap[0][2] >= duration:
+        _save_remap(remap_path, [])
+        return audio_path, None
+
+    # Keep only the selected stretches and close up the gaps between them
+    selection = "+".join(f"between(t,{start:.3f},{start + length:.3f})" for _, start, length in remap)
+    os.makedirs(UPLOAD_CACHE_DIR, exist_ok=True)
+    temp_path = os.path.join(UPLOAD_CACHE_DIR, f"{cache_key}.tmp.ogg")
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y",
+         "-i", audio_path,
+         "-map", "0:a:0",
+         "-af", f"aselect='{selection}',asetpts=N/SR/TB",
+         "-ac", "1", "-ar", str(UPLOAD_SAMPLE_RATE),
+         "-c:a", "libopus", "-b:a", "24k", "-application", "voip",
+         temp_path],
+        check=True
+    )
+    os.replace(temp_path, output_path)
+    _save_remap(remap_path, remap)
+
+    return output_path, remap
+
+
+def trim_files_for_upload(audio_files: List[str], content_hashes: List[str],
+                          max_workers: Optional[int] = None) -> Dict[str, Tuple[str, Optional[List]]]:
+    """
+    Remove long silences from several recordings in parallel.
+
+    Files that fail to trim are uploaded as recorded.
+
+    Args:
+        audio_files: Paths of the original recordings
+        content_hashes: Content hash of each recording, in the same order
+        max_workers: Maximum concurrent ffmpeg runs (default: number of CPUs)
+
+    Returns:
+        Dictionary mapping each original path to (path to upload, remap table or None)
+    """
+    if not audio_files:
+        return {}
+
+    workers = max_workers or os.cpu_count() or 1
+    print(f"Removing long silences from {len(audio_files)} files...")
+
+    results = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(trim_silence, audio_file, content_hash): audio_file
+            for audio_file, content_hash in zip(audio_files, content_hashes)
+        }
+        for future, audio_file in futures.items():
+            try:
+                results[audio_file] = future.result()
+            except Exception as e:
+                print(f"Error trimming silence from {os.path.basename(audio_file)}, uploading original: {str(e)}",
+                      file=sys.stderr)
+                results[audio_file] = (audio_file, None)
+
+    return results
+
+
+def report_silence_savings(label: str, trim_results: Dict[str, Tuple[str, Optional[List]]]) -> None:
+    """
+    Print how many seconds and bytes silence trimming saved.
+
+    Args:
+        label: Name of the session the files belong to
+        trim_results: Result of trim_files_for_upload
+    """
+    saved_seconds = 0.0
+    saved_bytes = 0
+    for audio_file, (upload_path, remap) in trim_results.items():
+        if remap is None:
+            continue
+        saved_seconds += get_audio_duration(audio_file) - sum(row[2] for row in remap)
+        saved_bytes += os.path.getsize(audio_file) - os.path.getsize(upload_path)
+
+    minutes, seconds = divmod(int(saved_seconds), 60)
+    print(f"Silence trimming for {label} saved {minutes}m{seconds:02d}s of audio "
+          f"and {saved_bytes / 1e6:.1f} MB of upload")
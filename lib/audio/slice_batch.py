@@ -0,0 +1,342 @@
+#!/usr/bin/env python
+"""
+Offline slice summarization through the OpenAI Batch API.
+
+Every slice that still needs a summary, across all transcripts, is written
+as one request line of a JSONL file in data/slice-batches/, which is
+uploaded and submitted as a batch at batch pricing. The batch is polled
+until it finishes and each result is written to its slice file in
+data/slices/<date>/ exactly as a synchronous run would. The batch's state is
+saved next to its input file before every call that creates something
+remotely, so an interrupted run picks the same upload or batch up again
+instead of submitting the slices twice.
+
+Setting OPENAI_BASE_URL points the client at a local stand-in for the
+files and batches endpoints.
+"""
+
+import datetime
+import glob
+import json
+import os
+import time
+from typing import Dict, List, Optional, Tuple
+
+from openai import OpenAI
+
+from .slice_manifest import SliceManifest
+from .slicing import map_transcript
+from .summarization import (build_slice_messages, finish_transcript_slices, plan_transcript_slices,
+                            render_slice_prompt_prefix, slice_payload, write_slice_summary)
+from ..config import SLICE_BATCHES_DIR
+from ..memory.references import get_player_roster
+
+BATCH_ENDPOINT = "/v1/chat/completions"
+BATCH_COMPLETION_WINDOW = "24h"
+
+# Seconds between batch status checks
+DEFAULT_POLL_INTERVAL = 60
+
+# Batch states after which no more results will arrive
+_FINAL_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+def _save_state(state: Dict) -> None:
+    """Write a batch's state file through a temporary file."""
+    temp_path = f"{state['state_path']}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(temp_path, state["state_path"])
+
+
+def _transcript_requests(transcript_path: str, model: str, settings: Dict,
+                         prompt_prefix: str) -> Tuple[Dict, List[Tuple[str, Dict, Dict]]]:
+    """
+    Plan a transcript's slices and build the batch requests of those still needing a summary.
+
+    Slices whose summaries can be reused are put in place straight away.
+
+    Args:
+        transcript_path: Path of the transcript to slice
+        model: The OpenAI model to use
+        settings: Slicing settings from get_slice_settings
+        prompt_prefix: Rendered prompt prefix shared by every request
+
+    Returns:
+        Tuple of (the transcript's slice plan, list of (custom ID, request
+        line, request details) for each slice to send)
+    """
+    requests = []
+    with map_transcript(transcript_path) as transcript:
+        plan = plan_transcript_slices(transcript_path, transcript, settings)
+        date = plan["date"]
+        for _, slice_info, slice_path in plan["reused"]:
+            write_slice_summary(plan["manifest"], slice_info['content_hash'], slice_path,
+                                plan["reused_text"][slice_info['content_hash']])
+
+        for index, slice_info, slice_path in plan["pending"]:
+            slice_text, context = slice_payload(transcript, slice_info, settings["overlap_context"],
+                                                settings["context_tokens"])
+            if not slice_text.strip():
+                # Entirely inside the previous slice, so there is nothing new to summarize
+                write_slice_summary(plan["manifest"], slice_info['content_hash'], slice_path, "")
+                continue
+
+            custom_id = f"{date}-{index+1:03d}"
+            requests.append((custom_id, {
+                "custom_id": custom_id,
+                "method": "POST",
+                "url": BATCH_ENDPOINT,
+                "body": {
+                    "model": model,
+                    "messages": build_slice_messages(slice_text, prompt_prefix, context),
+                    "temperature": 0.2
+                }
+            }, {
+                "date": date,
+                "slice_path": slice_path,
+                "content_hash": slice_info['content_hash']
+            }))
+    return plan, requests
+
+
+def submit_slice_batch(client: OpenAI, transcript_paths: List[str], model: str, settings: Dict) -> Optional[Dict]:
+    """
+    Write every slice that still needs a summary to a JSONL file and submit it as a batch.
+
+    Slices whose summaries can be reused are put in place straight away, and
+    transcripts with nothing left to send are marked current. A transcript
+    that can't be sliced is reported and left out of the batch.
+
+    Args:
+        client: OpenAI client
+        transcript_paths: Paths of the transcripts to slice
+        model: The OpenAI model to use
+        settings: Slicing settings from get_slice_settings
+
+    Returns:
+        The batch's state, or None if no slice needed a summary
+    """
+    os.makedirs(SLICE_BATCHES_DIR, exist_ok=True)
+    name = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+    # A batch resumed in the same run may have been started within the same second
+    if os.path.exists(os.path.join(SLICE_BATCHES_DIR, f"{name}.json")):
+        name = f"{name}-{len(glob.glob(os.path.join(SLICE_BATCHES_DIR, f'{name}*.json')))}"
+    input_path = os.path.join(SLICE_BATCHES_DIR, f"{name}.jsonl")
+    state = {
+        "state_path": os.path.join(SLICE_BATCHES_DIR, f"{name}.json"),
+        "input_path": input_path,
+        "input_file_id": None,
+        "batch_id": None,
+        "collected": False,
+        "requests": {},
+        "transcripts": {}
+    }
+    prompt_prefix = render_slice_prompt_prefix(get_player_roster())
+
+    with open(input_path, "w", encoding="utf-8") as batch_file:
+        for transcript_path in transcript_paths:
+            # A transcript's requests are only added once all of them are built
+            try:
+                plan, requests = _transcript_requests(transcript_path, model, settings, prompt_prefix)
+                if not requests:
+                    finish_transcript_slices(plan, sent=len(plan["pending"]))
+                    continue
+            except Exception as e:
+                print(f"Error preparing transcript {transcript_path} for the batch: {str(e)}")
+                continue
+
+            date = plan["date"]
+            for custom_id, request_line, request in requests:
+                batch_file.write(json.dumps(request_line) + "\n")
+                state["requests"][custom_id] = request
+
+            print(f"Transcript {date}: {len(requests)} of {len(plan['slices'])} slices added to the batch")
+            state["transcripts"][date] = {
+                "slices_dir": plan["slices_dir"],
+                "transcript_hash": plan["transcript_hash"],
+                "settings": settings,
+                "slices": [[s['content_hash'], file_name]
+                           for s, file_name in zip(plan["slices"], plan["slice_filenames"])],
+                "sent": len(plan["pending"])
+            }
+
+    if not state["requests"]:
+        os.remove(input_path)
+        return None
+
+    start_slice_batch(client, state)
+    print(f"Submitted batch {state['batch_id']} with {len(state['requests'])} slices from "
+          f"{len(state['transcripts'])} transcripts")
+    return state
+
+
+def _find_batch(client: OpenAI, input_file_id: str):
+    """Find a recent batch made from an uploaded input file, or None."""
+    for batch in client.batches.list(limit=100).data:
+        if batch.input_file_id == input_file_id:
+            return batch
+    return None
+
+
+def start_slice_batch(client: OpenAI, state: Dict) -> None:
+    """
+    Upload a batch's input file and create the batch from it.
+
+    The state is saved before each call, so a run that stops part way
+    leaves a state file the next run can finish from: an input file that
+    was never uploaded is uploaded, and an upload with no batch saved is
+    matched to the batch made from it, or made into one.
+
+    Args:
+        client: OpenAI client
+        state: The batch's state from submit_slice_batch, updated in place
+    """
+    if not state.get("input_file_id"):
+        _save_state(state)
+        with open(state["input_path"], "rb") as f:
+            input_file = client.files.create(file=f, purpose="batch")
+        state["input_file_id"] = input_file.id
+        batch = None
+    else:
+        batch = _find_batch(client, state["input_file_id"])
+
+    if batch is None:
+        _save_state(state)
+        batch = client.batches.create(
+            input_file_id=state["input_file_id"],
+            endpoint=BATCH_ENDPOINT,
+            completion_window=BATCH_COMPLETION_WINDOW,
+            metadata={"description": "transcript slice summaries"}
+        )
+    state["batch_id"] = batch.id
+    _save_state(state)
+
+
+def wait_for_batch(client: OpenAI, batch_id: str, poll_interval: float = DEFAULT_POLL_INTERVAL):
+    """
+    Poll a batch until it stops running.
+
+    Args:
+        client: OpenAI client
+        batch_id: ID of the batch
+        poll_interval: Seconds between status checks
+
+    Returns:
+        The finished batch object
+    """
+    last_status = None
+    while True:
+        batch = client.batches.retrieve(batch_id)
+        counts = batch.request_counts
+        status = (batch.status, counts.completed if counts else None)
+        if status != last_status:
+            progress = f" ({counts.completed + counts.failed}/{counts.total} done)" if counts else ""
+            print(f"Batch {batch_id}: {batch.status}{progress}")
+            last_status = status
+        if batch.status in _FINAL_STATUSES:
+            return batch
+        time.sleep(poll_interval)
+
+
+def collect_slice_batch(client: OpenAI, state: Dict, batch) -> int:
+    """
+    Write a finished batch's results to their slice files.
+
+    A transcript is marked current once all of its slices have summaries;
+    slices whose requests failed are sent again by the next run.
+
+    Args:
+        client: OpenAI client
+        state: The batch's state from submit_slice_batch
+        batch: The finished batch object
+
+    Returns:
+        int: Number of slices that got no summary
+    """
+    manifests = {date: SliceManifest(info["slices_dir"]) for date, info in state["transcripts"].items()}
+    written = {date: 0 for date in state["transcripts"]}
+
+    if batch.output_file_id:
+        output = client.files.content(batch.output_file_id).text
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            request = state["requests"].get(result.get("custom_id"))
+            response = result.get("response") or {}
+            if not request or response.get("status_code") != 200:
+                continue
+            processed_text = response["body"]["choices"][0]["message"]["content"]
+            write_slice_summary(manifests[request["date"]], request["content_hash"],
+                                request["slice_path"], processed_text)
+            written[request["date"]] += 1
+
+    failed = len(state["requests"]) - sum(written.values())
+    if batch.status != "completed":
+        print(f"Batch {batch.id} ended as {batch.status}")
+    if batch.error_file_id:
+        errors = client.files.content(batch.error_file_id).text.splitlines()
+        if errors:
+            print(f"First batch error: {errors[0][:300]}")
+
+    for date, info in state["transcripts"].items():
+        expected = sum(1 for request in state["requests"].values() if request["date"] == date)
+        plan = {
+            "date": date,
+            "manifest": manifests[date],
+            "transcript_hash": info["transcript_hash"],
+            "settings": info["settings"],
+            "slices": [{"content_hash": content_hash} for content_hash, _ in info["slices"]],
+            "slice_filenames": [file_name for _, file_name in info["slices"]],
+            "unchanged": False
+        }
+        print(f"Transcript {date}: ", end="")
+        finish_transcript_slices(plan, sent=info["sent"], failed=expected - written[date])
+
+    state["collected"] = True
+    _save_state(state)
+    return failed
+
+
+def process_slices_in_batch(transcript_paths: List[str], openai_api_key: str, model: str,
+                            settings: Dict, poll_interval: float = DEFAULT_POLL_INTERVAL) -> None:
+    """
+    Summarize all pending slices of the given transcripts through the Batch API.
+
+    A batch left unfinished by an earlier run, or one it prepared but never
+    got to submit, is finished and collected first, so its slices aren't
+    submitted again.
+
+    Args:
+        transcript_paths: Paths of the transcripts to slice
+        openai_api_key: OpenAI API key
+        model: The OpenAI model to use
+        settings: Slicing settings from get_slice_settings
+        poll_interval: Seconds between batch status checks
+    """
+    client = OpenAI(api_key=openai_api_key)
+
+    for state_path in sorted(glob.glob(os.path.join(SLICE_BATCHES_DIR, "*.json"))):
+        with open(state_path, "r") as f:
+            state = json.load(f)
+        if state.get("collected"):
+            continue
+        if not state.get("batch_id"):
+            # The earlier run stopped before its batch was created
+            if not state.get("input_file_id") and not os.path.exists(state["input_path"]):
+                print(f"Skipping {os.path.basename(state_path)}: its batch input file is gone")
+                continue
+            print(f"Submitting the batch of {os.path.basename(state_path)} left by an earlier run...")
+            start_slice_batch(client, state)
+        print(f"Resuming batch {state['batch_id']} from an earlier run...")
+        collect_slice_batch(client, state, wait_for_batch(client, state["batch_id"], poll_interval))
+
+    state = submit_slice_batch(client, transcript_paths, model, settings)
+    if state is None:
+        print("No slices need summarizing")
+        return
+
+    failed = collect_slice_batch(client, state, wait_for_batch(client, state["batch_id"], poll_interval))
+    if failed:
+        print(f"{failed} slice(s) got no summary; run again to send them")
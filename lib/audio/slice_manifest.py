@@ -0,0 +1,138 @@
+#!/usr/bin/env python
+"""
+Per-session manifest of slice summaries.
+
+Maps the SHA-256 hash of each slice's source text to the summary file made
+from it, so that when a transcript is edited or re-sliced only slices whose
+text changed are sent again and every other summary is reused.
+"""
+
+import glob
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+def get_slice_filename(index: int, slice_info: Dict) -> str:
+    """
+    Get the summary filename of a slice.
+
+    Args:
+        index: Zero-based position of the slice in the transcript
+        slice_info: Slice dictionary with start_time and end_time
+
+    Returns:
+        str: Filename like slice_001_000000_to_001500.md
+    """
+    start = slice_info['start_time'].replace(':', '')
+    end = slice_info['end_time'].replace(':', '')
+    return f"slice_{index+1:03d}_{start}_to_{end}.md"
+
+
+class SliceManifest:
+    """Record of which summary file in a session's slices directory holds which slice."""
+
+    def __init__(self, slices_dir: str):
+        self.slices_dir = slices_dir
+        self.path = os.path.join(slices_dir, MANIFEST_FILENAME)
+        self.exists = os.path.exists(self.path)
+        self.transcript_hash: Optional[str] = None
+        self.settings: Dict = {}
+        self.summaries: Dict[str, str] = {}  # content hash -> summary filename
+
+        if self.exists:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.transcript_hash = data.get("transcript_hash")
+            self.settings = data.get("settings", {})
+            self.summaries = data.get("summaries", {})
+
+    def _save(self) -> None:
+        """Write the manifest through a temporary file."""
+        os.makedirs(self.slices_dir, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            json.dump({
+                "transcript_hash": self.transcript_hash,
+                "settings": self.settings,
+                "summaries": self.summaries
+            }, f, indent=2)
+        os.replace(temp_path, self.path)
+        self.exists = True
+
+    def is_current(self, transcript_hash: str, settings: Dict) -> bool:
+        """
+        Check whether the summaries were made from this exact transcript and slicing.
+
+        Args:
+            transcript_hash: SHA-256 hash of the whole transcript
+            settings: Slicing settings the slices are made with
+
+        Returns:
+            bool: True if nothing needs to be sent
+        """
+        return (self.transcript_hash == transcript_hash and self.settings == settings
+                and all(os.path.exists(os.path.join(self.slices_dir, name))
+                        for name in self.summaries.values()))
+
+    def read_summary(self, content_hash: str) -> Optional[str]:
+        """
+        Read the summary made from a slice's text, if there is one.
+
+        Args:
+            content_hash: SHA-256 hash of the slice's text
+
+        Returns:
+            The summary text, or None if the slice hasn't been summarized
+        """
+        file_name = self.summaries.get(content_hash)
+        if not file_name:
+            return None
+        summary_path = os.path.join(self.slices_dir, file_name)
+        if not os.path.exists(summary_path):
+            return None
+        with open(summary_path, "r") as f:
+            return f.read()
+
+    def record(self, content_hash: str, file_name: str) -> None:
+        """
+        Record that a summary file now holds the summary of a slice.
+
+        Args:
+            content_hash: SHA-256 hash of the slice's text
+            file_name: Name of the summary file in the slices directory
+        """
+        if self.summaries.get(content_hash) == file_name:
+            return
+        # The file may have held another slice's summary before it was overwritten
+        self.summaries = {h: name for h, name in self.summaries.items() if name != file_name}
+        self.summaries[content_hash] = file_name
+        self._save()
+
+    def finish(self, transcript_hash: str, settings: Dict, slices: List[Tuple[str, str]]) -> List[str]:
+        """
+        Keep only the current slices and delete summary files no slice uses any more.
+
+        Args:
+            transcript_hash: SHA-256 hash of the whole transcript
+            settings: Slicing settings the slices were made with
+            slices: (content hash, summary filename) of every current slice
+
+        Returns:
+            List of deleted summary filenames
+        """
+        current = {name for _, name in slices}
+        removed = []
+        for summary_path in glob.glob(os.path.join(self.slices_dir, "slice_*.md")):
+            file_name = os.path.basename(summary_path)
+            if file_name not in current:
+                os.remove(summary_path)
+                removed.append(file_name)
+
+        self.transcript_hash = transcript_hash
+        self.settings = settings
+        self.summaries = dict(slices)
+        self._save()
+        return sorted(removed)
@@ -1,16 +1,184 @@
 #!/usr/bin/env python
 """
-Functions for slicing transcripts into manageable chunks based on timestamps.
+Functions for slicing transcripts into manageable chunks based on timestamps
+or on token budgets.
 """
 
+import contextlib
+import hashlib
+import mmap
 import re
-from typing import List, Dict
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+# Timestamps in the format [HH:MM:SS], in decoded text and in raw file bytes
+_TIMESTAMP_PATTERN = re.compile(r'\[(\d{2}):(\d{2}):(\d{2})\]')
+_TIMESTAMP_BYTES_PATTERN = re.compile(rb'\[(\d{2}):(\d{2}):(\d{2})\]')
+
+# Pieces counted by estimate_tokens: up to four word characters, or one symbol
+_TOKEN_PATTERN = re.compile(r'\w{1,4}|[^\w\s]')
+
+# Default budgets for token-based slicing
+DEFAULT_SLICE_TOKENS = 4000
+DEFAULT_OVERLAP_TOKENS = 1000
+
+# Content-defined slices are between these fractions of the target token budget
+STABLE_MIN_FRACTION = 0.5
+STABLE_MAX_FRACTION = 2.0
+
+
+def _parse_timestamps(transcript: Union[str, bytes, mmap.mmap]) -> Tuple[List[int], List[str], List[int]]:
+    """
+    Find every timestamp in a transcript and parse it once.
+    
+    Args:
+        transcript: Transcript text, or its raw UTF-8 bytes (e.g. an mmap)
+        
+    Returns:
+        Tuple of (offset of each timestamp, its HH:MM:SS label, its value in seconds);
+        offsets are byte offsets for bytes input
+    """
+    pattern = _TIMESTAMP_PATTERN if isinstance(transcript, str) else _TIMESTAMP_BYTES_PATTERN
+    offsets = []
+    labels = []
+    times = []
+    for match in pattern.finditer(transcript):
+        hours, minutes, seconds = match.groups()
+        if not isinstance(hours, str):
+            hours, minutes, seconds = hours.decode(), minutes.decode(), seconds.decode()
+        offsets.append(match.start())
+        labels.append(f"{hours}:{minutes}:{seconds}")
+        times.append(int(hours) * 3600 + int(minutes) * 60 + int(seconds))
+    return offsets, labels, times
+
+
+def _time_windows(times: List[int], slice_minutes: int, overlap_minutes: int) -> Iterator[Tuple[int, int]]:
+    """
+    Find the timestamps that start and end each time window.
+    
+    Window edges are the first timestamp at or after a given time. Running
+    maxima keep that lookup a bisection even if timestamps ever go backwards.
+    
+    Args:
+        times: Timestamp values in seconds, in transcript order
+        slice_minutes: Size of each slice in minutes
+        overlap_minutes: Overlap between slices in minutes
+        
+    Yields:
+        Tuple of (index of the first timestamp, index of the last timestamp) per slice
+    """
+    # Convert slice and overlap times to seconds
+    slice_seconds = slice_minutes * 60
+    overlap_seconds = overlap_minutes * 60
+    step_seconds = slice_seconds - overlap_seconds
+    
+    # The last timestamp determines the end of the transcript
+    last_total_seconds = times[-1]
+    running_max = list(accumulate(times, max))
+    
+    current_start = 0
+    while current_start <= last_total_seconds:
+        current_end = min(current_start + slice_seconds, last_total_seconds + 60)  # Add 60 seconds buffer at the end
+        
+        # Find the closest timestamps to the start and end times, falling back
+        # to the first and last timestamps
+        start_idx = bisect_left(running_max, current_start)
+        if start_idx == len(times):
+            start_idx = 0
+        end_idx = bisect_left(running_max, current_end)
+        if end_idx == len(times):
+            end_idx = len(times) - 1
+        
+        yield start_idx, end_idx
+        
+        # Move to the next slice
+        current_start += step_seconds
+
+
+def _token_windows(token_totals: List[int], slice_tokens: int, overlap_tokens: int) -> Iterator[Tuple[int, int]]:
+    """
+    Group speaker turns into slices by token budget.
+    
+    Args:
+        token_totals: Running token totals at the start of every turn, plus the overall total
+        slice_tokens: Estimated token budget of each slice
+        overlap_tokens: Estimated token budget of the overlap between slices
+        
+    Yields:
+        Tuple of (index of the first turn, index after the last turn) per slice
+    """
+    turn_count = len(token_totals) - 1
+    start_turn = 0
+    while True:
+        # Take as many whole turns as fit the budget, but always at least one
+        end_turn = bisect_right(token_totals, token_totals[start_turn] + slice_tokens) - 1
+        end_turn = max(end_turn, start_turn + 1)
+        
+        yield start_turn, end_turn
+        
+        if end_turn >= turn_count:
+            break
+        
+        # Start the next slice with the turns that fit in the overlap budget
+        start_turn = max(start_turn + 1, bisect_left(token_totals, token_totals[end_turn] - overlap_tokens))
+
+
+def _content_defined_windows(transcript: Union[bytes, mmap.mmap], turn_bounds: List[int],
+                             token_totals: List[int], target_tokens: int,
+                             overlap_tokens: int) -> Iterator[Tuple[int, int]]:
+    """
+    Group speaker turns into slices whose boundaries depend only on nearby content.
+    
+    A cut before a turn is taken when a hash of that turn's text falls under
+    a threshold proportional to the turn's tokens, once the slice has at
+    least half the target budget; a cut is forced before a slice would pass
+    twice the budget. Slices average about target_tokens, and editing a few
+    lines only moves the cuts next to the edit, so the other slices keep
+    their exact text. Each slice starts with the last turns of the one before
+    it, up to overlap_tokens.
+    
+    Args:
+        transcript: Raw UTF-8 bytes of the transcript
+        turn_bounds: Byte offset of every turn, plus the end of the transcript
+        token_totals: Running token totals at the start of every turn, plus the overall total
+        target_tokens: Average estimated token budget of each slice
+        overlap_tokens: Estimated token budget of the overlap between slices
+        
+    Yields:
+        Tuple of (index of the first turn, index after the last turn) per slice
+    """
+    turn_count = len(token_totals) - 1
+    min_tokens = target_tokens * STABLE_MIN_FRACTION
+    max_tokens = target_tokens * STABLE_MAX_FRACTION
+    
+    cuts = [0]
+    for turn in range(1, turn_count):
+        turn_tokens = token_totals[turn + 1] - token_totals[turn]
+        slice_tokens = token_totals[turn] - token_totals[cuts[-1]]
+        if slice_tokens + turn_tokens > max_tokens:
+            cuts.append(turn)
+        elif slice_tokens >= min_tokens:
+            digest = hashlib.blake2b(transcript[turn_bounds[turn]:turn_bounds[turn + 1]], digest_size=8).digest()
+            if int.from_bytes(digest, "big") / 2 ** 64 < turn_tokens / (target_tokens - min_tokens):
+                cuts.append(turn)
+    cuts.append(turn_count)
+    
+    for i in range(len(cuts) - 1):
+        start_turn = cuts[i]
+        if i:
+            # Only reach back into the previous slice, never past its own start
+            start_turn = max(cuts[i - 1], bisect_left(token_totals, token_totals[cuts[i]] - overlap_tokens))
+        yield start_turn, cuts[i + 1]
 
 
 def slice_transcript(transcript_text: str, slice_minutes: int = 30, overlap_minutes: int = 5) -> List[Dict]:
     """
     Slice a transcript into chunks based on timestamps.
     
+    Timestamps are parsed once and window edges are found by bisection, so
+    the cost is O((timestamps + slices) log timestamps) plus copying the text.
+    
     Args:
         transcript_text: The full transcript text
         slice_minutes: Size of each slice in minutes
@@ -19,13 +187,84 @@ def slice_transcript(transcript_text: str, slice_minutes: int = 30, overlap_minu
     Returns:
         List of dictionaries containing slice info (start_time, end_time, text)
     """
-    # Regular expression to find timestamps in the format [HH:MM:SS]
-    timestamp_pattern = r'\[(\d{2}):(\d{2}):(\d{2})\]'
+    offsets, labels, times = _parse_timestamps(transcript_text)
+    
+    if not times:
+        # If no timestamps found, return the entire transcript as one slice
+        return [{
+            "start_time": "00:00:00",
+            "end_time": "Unknown",
+            "text": transcript_text
+        }]
     
-    # Find all timestamps in the transcript
-    matches = list(re.finditer(timestamp_pattern, transcript_text))
+    slices = []
+    for start_idx, end_idx in _time_windows(times, slice_minutes, overlap_minutes):
+        # Extract the text for this slice
+        if end_idx < len(times) - 1:
+            slice_text = transcript_text[offsets[start_idx]:offsets[end_idx + 1]]
+        else:
+            slice_text = transcript_text[offsets[start_idx]:]
+        
+        slices.append({
+            "start_time": labels[start_idx],
+            "end_time": labels[end_idx],
+            "text": slice_text
+        })
     
-    if not matches:
+    return slices
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate how many LLM tokens a piece of text is.
+    
+    Counts runs of up to four word characters plus each punctuation mark,
+    which tracks GPT tokenizers closely for English dialogue without loading
+    a tokenizer.
+    
+    Args:
+        text: Text to estimate
+        
+    Returns:
+        int: Estimated token count
+    """
+    return len(_TOKEN_PATTERN.findall(text))
+
+
+def _turn_token_totals(transcript: Union[str, bytes, mmap.mmap], offsets: List[int]) -> List[int]:
+    """Get the running token totals at the start of every speaker turn."""
+    turn_bounds = offsets + [len(transcript)]
+    token_totals = [0]
+    for i in range(len(offsets)):
+        turn = transcript[turn_bounds[i]:turn_bounds[i + 1]]
+        if not isinstance(turn, str):
+            turn = turn.decode("utf-8")
+        token_totals.append(token_totals[-1] + estimate_tokens(turn))
+    return token_totals
+
+
+def slice_transcript_by_tokens(transcript_text: str, slice_tokens: int = DEFAULT_SLICE_TOKENS,
+                               overlap_tokens: int = DEFAULT_OVERLAP_TOKENS) -> List[Dict]:
+    """
+    Slice a transcript into chunks of roughly equal token counts.
+    
+    Cuts always land on speaker turns (the [HH:MM:SS] timestamps), so a busy
+    stretch gets more, shorter slices and a quiet one fewer, longer slices.
+    Each slice repeats the last turns of the one before it, up to
+    overlap_tokens. A single turn longer than slice_tokens becomes a slice
+    of its own.
+    
+    Args:
+        transcript_text: The full transcript text
+        slice_tokens: Estimated token budget of each slice
+        overlap_tokens: Estimated token budget of the overlap between slices
+        
+    Returns:
+        List of dictionaries containing slice info (start_time, end_time, text)
+    """
+    offsets, labels, _ = _parse_timestamps(transcript_text)
+    
+    if not offsets:
         # If no timestamps found, return the entire transcript as one slice
         return [{
             "start_time": "00:00:00",
@@ -33,74 +272,138 @@ def slice_transcript(transcript_text: str, slice_minutes: int = 30, overlap_minu
             "text": transcript_text
         }]
     
-    # Convert slice and overlap times to seconds
-    slice_seconds = slice_minutes * 60
-    overlap_seconds = overlap_minutes * 60
-    step_seconds = slice_seconds - overlap_seconds
+    turn_bounds = offsets + [len(transcript_text)]
+    return [
+        {
+            "start_time": labels[start_turn],
+            "end_time": labels[end_turn - 1],
+            "text": transcript_text[offsets[start_turn]:turn_bounds[end_turn]]
+        }
+        for start_turn, end_turn in _token_windows(_turn_token_totals(transcript_text, offsets),
+                                                   slice_tokens, overlap_tokens)
+    ]
+
+
+@contextlib.contextmanager
+def map_transcript(transcript_path: str) -> Iterator[Union[mmap.mmap, bytes]]:
+    """
+    Memory-map a transcript file read-only.
+    
+    Args:
+        transcript_path: Path to the transcript file
+        
+    Yields:
+        The file's bytes as an mmap (an empty bytes object for an empty file)
+    """
+    with open(transcript_path, "rb") as f:
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            yield b""
+            return
+        with mapped:
+            yield mapped
+
+
+def iter_transcript_slices(transcript: Union[mmap.mmap, bytes], slice_minutes: int = 15, overlap_minutes: int = 5,
+                           slice_tokens: Optional[int] = None,
+                           overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                           stable: bool = False) -> Iterator[Dict]:
+    """
+    Slice a memory-mapped transcript lazily into (offset, length) views.
     
-    # Get the last timestamp to determine the end of the transcript
-    last_match = matches[-1]
-    last_hours = int(last_match.group(1))
-    last_minutes = int(last_match.group(2))
-    last_seconds = int(last_match.group(3))
-    last_total_seconds = last_hours * 3600 + last_minutes * 60 + last_seconds
+    Boundaries are the same as slice_transcript, or slice_transcript_by_tokens
+    when slice_tokens is given, but no slice text is copied; read it with
+    read_slice_text when it is needed. With stable set, boundaries are
+    content-defined (see _content_defined_windows) around a target of
+    slice_tokens, so local edits leave the other slices unchanged. Every
+    slice carries a SHA-256 hash of its text and the length of its leading
+    overlap with the previous slice.
     
-    # Create slices
-    slices = []
-    current_start = 0
+    Args:
+        transcript: Raw UTF-8 bytes of the transcript, e.g. from map_transcript
+        slice_minutes: Size of each slice in minutes
+        overlap_minutes: Overlap between slices in minutes
+        slice_tokens: Slice by this estimated token budget per slice instead of by minutes
+        overlap_tokens: Estimated token budget of the overlap when slicing by tokens
+        stable: Use content-defined boundaries that stay put under local edits
+        
+    Yields:
+        Dictionaries containing slice info (start_time, end_time, offset,
+        length, content_hash, context_length)
+    """
+    view = memoryview(transcript)
+    previous_end = 0
     
-    while current_start <= last_total_seconds:
-        current_end = min(current_start + slice_seconds, last_total_seconds + 60)  # Add 60 seconds buffer at the end
+    def slice_info(start_time: str, end_time: str, offset: int, length: int) -> Dict:
+        nonlocal previous_end
+        context_length = max(0, min(previous_end, offset + length) - offset)
+        previous_end = max(previous_end, offset + length)
+        return {
+            "start_time": start_time,
+            "end_time": end_time,
+            "offset": offset,
+            "length": length,
+            "content_hash": hashlib.sha256(view[offset:offset + length]).hexdigest(),
+            "context_length": context_length
+        }
+    
+    try:
+        offsets, labels, times = _parse_timestamps(transcript)
         
-        # Find the closest timestamp to the start and end times
-        start_idx = None
-        end_idx = None
-        
-        for i, match in enumerate(matches):
-            hours = int(match.group(1))
-            minutes = int(match.group(2))
-            seconds = int(match.group(3))
-            total_seconds = hours * 3600 + minutes * 60 + seconds
-            
-            # Find the closest timestamp to the start time
-            if total_seconds >= current_start and start_idx is None:
-                start_idx = i
-            
-            # Find the closest timestamp to the end time
-            if total_seconds >= current_end and end_idx is None:
-                end_idx = i
-                break
-        
-        # If we couldn't find an end index, use the last match
-        if end_idx is None:
-            end_idx = len(matches) - 1
-        
-        # If we couldn't find a start index, use the first match
-        if start_idx is None:
-            start_idx = 0
+        if not times:
+            # If no timestamps found, the entire transcript is one slice
+            yield slice_info("00:00:00", "Unknown", 0, len(transcript))
+            return
         
-        # Get the text between the start and end timestamps
-        if start_idx <= end_idx:
-            start_match = matches[start_idx]
-            end_match = matches[end_idx]
-            
-            # Format the start and end times
-            start_time = f"{start_match.group(1)}:{start_match.group(2)}:{start_match.group(3)}"
-            end_time = f"{end_match.group(1)}:{end_match.group(2)}:{end_match.group(3)}"
-            
-            # Extract the text for this slice
-            if end_idx < len(matches) - 1:
-                slice_text = transcript_text[start_match.start():matches[end_idx + 1].start()]
+        turn_bounds = offsets + [len(transcript)]
+        if stable or slice_tokens:
+            token_totals = _turn_token_totals(transcript, offsets)
+            if stable:
+                windows = _content_defined_windows(transcript, turn_bounds, token_totals,
+                                                   slice_tokens or DEFAULT_SLICE_TOKENS, overlap_tokens)
             else:
-                slice_text = transcript_text[start_match.start():]
-            
-            slices.append({
-                "start_time": start_time,
-                "end_time": end_time,
-                "text": slice_text
-            })
+                windows = _token_windows(token_totals, slice_tokens, overlap_tokens)
+            for start_turn, end_turn in windows:
+                yield slice_info(labels[start_turn], labels[end_turn - 1], offsets[start_turn],
+                                 turn_bounds[end_turn] - offsets[start_turn])
+        else:
+            for start_idx, end_idx in _time_windows(times, slice_minutes, overlap_minutes):
+                yield slice_info(labels[start_idx], labels[end_idx], offsets[start_idx],
+                                 turn_bounds[end_idx + 1] - offsets[start_idx])
+    finally:
+        # An exported buffer would keep the mmap from closing
+        view.release()
+
+
+def read_slice_text(transcript: Union[mmap.mmap, bytes], slice_info: Dict) -> str:
+    """
+    Materialize the text of a slice yielded by iter_transcript_slices.
+    
+    Args:
+        transcript: The same bytes the slice was taken from
+        slice_info: Slice info with offset and length
         
-        # Move to the next slice
-        current_start += step_seconds
+    Returns:
+        str: The slice text
+    """
+    start = slice_info["offset"]
+    return transcript[start:start + slice_info["length"]].decode("utf-8")
+
+
+def read_slice_parts(transcript: Union[mmap.mmap, bytes], slice_info: Dict) -> Tuple[str, str]:
+    """
+    Materialize a slice split into its overlap with the previous slice and its new part.
     
-    return slices
+    Args:
+        transcript: The same bytes the slice was taken from
+        slice_info: Slice info with offset, length and context_length
+        
+    Returns:
+        Tuple of (overlap text, new text)
+    """
+    start = slice_info["offset"]
+    split = start + slice_info.get("context_length", 0)
+    return (transcript[start:split].decode("utf-8"),
+            transcript[split:start + slice_info["length"]].decode("utf-8"))
@@ -3,35 +3,42 @@
 Functions for summarizing transcript slices using OpenAI's LLM.
 """
 
+import asyncio
+import hashlib
 import os
 import time
-import re
-from typing import List, Dict
-import openai
-from openai import OpenAI
+from typing import Callable, List, Dict, Optional, Tuple
+import numpy as np
+from openai import AsyncOpenAI
 
-from .slicing import slice_transcript
+from .cleaning import condense_context, get_clean_transcript
+from .rate_limit import TokenBucketLimiter
+from .slice_manifest import SliceManifest, get_slice_filename
+from .slicing import (map_transcript, iter_transcript_slices, read_slice_parts, read_slice_text,
+                      estimate_tokens, DEFAULT_OVERLAP_TOKENS)
 from ..memory.references import get_player_roster
 
+# Estimated token budget of the condensed overlap sent ahead of a slice
+DEFAULT_CONTEXT_TOKENS = 300
 
-def process_transcript_slice(transcript_chunk: str, openai_api_key: str, model: str = "gpt-4.1-mini") -> str:
+# Output tokens reserved per request by the tokens-per-minute limiter
+EXPECTED_SUMMARY_TOKENS = 1500
+
+
+SYSTEM_MESSAGE = "You are THE RECORDER, a ruthless but narrative-aware stenographer."
+
+
+def render_slice_prompt_prefix(player_roster: str) -> str:
     """
-    Process a slice of transcript using OpenAI's LLM.
+    Render the part of the slice prompt that is the same for every slice.
     
     Args:
-        transcript_chunk: A chunk of transcript text to process
-        openai_api_key: OpenAI API key
-        model: The OpenAI model to use
+        player_roster: Player roster information
         
     Returns:
-        str: Processed transcript slice
+        str: The prompt up to where the slice itself begins
     """
-    client = OpenAI(api_key=openai_api_key)
-    
-    # Get player roster information
-    player_roster = get_player_roster()
-    
-    prompt = f"""You are **THE RECORDER**, a ruthless but narrative-aware stenographer.
+    return f"""You are **THE RECORDER**, a ruthless but narrative-aware stenographer.
 
 CONTEXT
 • Each input chunk covers some amount of raw audio.
@@ -69,97 +76,464 @@ Convert the slice into the EXACT structure below, preserving plot-critical detai
 - Who is Anar and what is his role?
 (Max 3 bullets; skip if none.)
 
-<BEGIN_SLICE>
+"""
+
+
+def build_slice_messages(transcript_chunk: str, prompt_prefix: str,
+                         context: Optional[str] = None) -> List[Dict]:
+    """
+    Build the chat messages that ask for a slice summary.
+    
+    Args:
+        transcript_chunk: A chunk of transcript text to process
+        prompt_prefix: Prompt rendered by render_slice_prompt_prefix
+        context: Condensed conversation leading into the slice, sent as a
+            block the model must not summarize
+        
+    Returns:
+        List of chat messages
+    """
+    context_block = ""
+    if context:
+        context_block = f"""<CONTEXT_ONLY>
+The conversation just before this slice, condensed. It belongs to the previous slice and is summarized there: use it only to follow what is going on, and do NOT summarize it or repeat its events.
+
+{context}
+</CONTEXT_ONLY>
+
+"""
+    
+    prompt = f"""{prompt_prefix}{context_block}<BEGIN_SLICE>
 {transcript_chunk}
 <END_SLICE>
 """
     
-    try:
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": "You are THE RECORDER, a ruthless but narrative-aware stenographer."},
-                {"role": "user", "content": prompt}
-            ],
+    return [
+        {"role": "system", "content": SYSTEM_MESSAGE},
+        {"role": "user", "content": prompt}
+    ]
+
+
+class SliceSummarizer:
+    """
+    Summarizes slices for a whole run with one pooled OpenAI client.
+    
+    The player roster is read once and the shared part of the prompt is
+    rendered up front. Requests run on the summarizer's own event loop, so
+    HTTP connections stay open from one transcript to the next. Every call's
+    latency and the connection it used are recorded for report().
+    """
+    
+    def __init__(self, openai_api_key: str, model: str = "gpt-4.1", concurrency: int = 1,
+                 limiter: Optional[TokenBucketLimiter] = None):
+        self.model = model
+        self.concurrency = max(1, concurrency)
+        self.limiter = limiter or TokenBucketLimiter()
+        self.prompt_prefix = render_slice_prompt_prefix(get_player_roster())
+        self._loop = asyncio.new_event_loop()
+        self.client = AsyncOpenAI(api_key=openai_api_key)
+        self.latencies: List[float] = []
+        self.reused_calls = 0
+        self._connections: Dict[int, object] = {}  # Held so their ids stay unique
+    
+    def build_messages(self, transcript_chunk: str, context: Optional[str] = None) -> List[Dict]:
+        """Build a slice's chat messages on the pre-rendered prompt prefix."""
+        return build_slice_messages(transcript_chunk, self.prompt_prefix, context)
+    
+    def run(self, coroutine):
+        """Run a coroutine on the summarizer's event loop and return its result."""
+        return self._loop.run_until_complete(coroutine)
+    
+    async def summarize(self, transcript_chunk: str, context: Optional[str] = None) -> str:
+        """
+        Summarize one slice, waiting for the rate limiter first.
+        
+        Args:
+            transcript_chunk: Slice text to summarize
+            context: Condensed conversation leading into the slice
+            
+        Returns:
+            str: The slice summary
+        """
+        messages = self.build_messages(transcript_chunk, context)
+        await self.limiter.acquire(sum(estimate_tokens(m["content"]) for m in messages) + EXPECTED_SUMMARY_TOKENS)
+        
+        started = time.perf_counter()
+        raw_response = await self.client.chat.completions.with_raw_response.create(
+            model=self.model,
+            messages=messages,
             temperature=0.2  # Lower temperature for more consistent output
         )
+        self.latencies.append(time.perf_counter() - started)
+        
+        # httpx exposes the connection a response arrived on
+        stream = raw_response.http_response.extensions.get("network_stream")
+        if stream is not None:
+            if id(stream) in self._connections:
+                self.reused_calls += 1
+            else:
+                self._connections[id(stream)] = stream
+        
+        return raw_response.parse().choices[0].message.content
+    
+    def report(self) -> Optional[str]:
+        """
+        Describe connection reuse and call latency so far.
         
-        # Extract the content from the response
-        processed_text = response.choices[0].message.content
-        return processed_text
+        Returns:
+            str: One-line summary, or None if no calls were made
+        """
+        if not self.latencies:
+            return None
+        latencies = np.array(self.latencies)
+        connections = f"{len(self._connections)} connections, {self.reused_calls} calls on a reused one"
+        if not self._connections:
+            connections = "connection reuse unknown"
+        return (f"{len(latencies)} OpenAI calls over {connections}; latency "
+                f"mean {latencies.mean():.2f} s, p50 {np.percentile(latencies, 50):.2f} s, "
+                f"p95 {np.percentile(latencies, 95):.2f} s, max {latencies.max():.2f} s")
     
-    except Exception as e:
-        print(f"Error processing transcript slice: {str(e)}")
-        return f"ERROR: {str(e)}"
+    def close(self) -> None:
+        """Close the client's connections and the event loop."""
+        if self._loop.is_closed():
+            return
+        self.run(self.client.close())
+        self._loop.close()
 
 
-def process_transcript_slices(transcript_path: str, openai_api_key: str, model: str = "gpt-4.1", 
-                             slice_minutes: int = 15, overlap_minutes: int = 5) -> List[Dict]:
+def slice_payload(transcript, slice_info: Dict, overlap_context: bool,
+                   context_tokens: int) -> Tuple[str, Optional[str]]:
     """
-    Process a transcript by slicing it and sending each slice to OpenAI for processing.
+    Get the text and context block a slice is sent with.
     
     Args:
-        transcript_path: Path to the transcript file
-        openai_api_key: OpenAI API key
-        model: The OpenAI model to use
-        slice_minutes: Size of each slice in minutes
-        overlap_minutes: Overlap between slices in minutes
+        transcript: The bytes the slice was taken from
+        slice_info: Slice info from iter_transcript_slices
+        overlap_context: Send the overlap with the previous slice as a
+            condensed context block instead of in full
+        context_tokens: Estimated token budget of the context block
         
     Returns:
-        List of dictionaries containing processed slices
+        Tuple of (slice text to summarize, context block or None)
+    """
+    if not overlap_context:
+        return read_slice_text(transcript, slice_info), None
+    context, new_text = read_slice_parts(transcript, slice_info)
+    return new_text, condense_context(context, context_tokens) or None
+
+
+async def _summarize_slices(pending: List[Tuple[int, Dict, str]], transcript, summarizer: SliceSummarizer,
+                            overlap_context: bool, context_tokens: int,
+                            on_done: Callable[[int, Dict, str, str], None]) -> Tuple[int, int, int]:
+    """
+    Summarize slices concurrently, handing each summary over as soon as it arrives.
+    
+    Args:
+        pending: (index, slice info, summary path) of each slice to send
+        transcript: The bytes the slices were taken from
+        summarizer: The run's slice summarizer
+        overlap_context: Send overlaps as condensed context blocks
+        context_tokens: Estimated token budget of a context block
+        on_done: Called with (index, slice info, summary path, summary text)
+            for every slice that was summarized
+        
+    Returns:
+        Tuple of (slices failed, estimated full slice tokens, estimated tokens sent)
+    """
+    semaphore = asyncio.Semaphore(summarizer.concurrency)
+    failed = 0
+    full_tokens = 0
+    payload_tokens = 0
+    
+    async def summarize(index: int, slice_info: Dict, slice_path: str) -> None:
+        nonlocal failed, full_tokens, payload_tokens
+        async with semaphore:
+            slice_text, context = slice_payload(transcript, slice_info, overlap_context, context_tokens)
+            if overlap_context:
+                full_tokens += estimate_tokens(read_slice_text(transcript, slice_info))
+                payload_tokens += estimate_tokens(slice_text) + estimate_tokens(context or "")
+            if not slice_text.strip():
+                # Entirely inside the previous slice, so there is nothing new to summarize
+                on_done(index, slice_info, slice_path, "")
+                return
+            
+            print(f"Processing slice {index+1} ({slice_info['start_time']} to {slice_info['end_time']})...")
+            try:
+                processed_text = await summarizer.summarize(slice_text, context)
+            except Exception as e:
+                # Nothing is written, so the next run sends the slice again
+                print(f"Error processing slice {index+1}: {str(e)}")
+                failed += 1
+                return
+            on_done(index, slice_info, slice_path, processed_text)
+    
+    await asyncio.gather(*(summarize(index, slice_info, slice_path)
+                           for index, slice_info, slice_path in pending))
+    return failed, full_tokens, payload_tokens
+
+
+def get_slice_settings(slice_minutes: int = 15, overlap_minutes: int = 5,
+                       slice_tokens: Optional[int] = None,
+                       overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                       stable: bool = False, overlap_context: bool = False,
+                       context_tokens: int = DEFAULT_CONTEXT_TOKENS) -> Dict:
     """
-    # Read the transcript file
-    with open(transcript_path, "r") as f:
-        transcript_text = f.read()
+    Collect the settings that decide how a transcript is sliced and sent.
     
-    # Slice the transcript
-    slices = slice_transcript(transcript_text, slice_minutes, overlap_minutes)
+    Summaries made with other settings are only reused slice by slice, when
+    a slice's payload is unchanged.
     
-    # Create directory for processed slices
+    Returns:
+        Dictionary of slicing settings, as stored in the slice manifest
+    """
+    return {
+        "slice_minutes": slice_minutes,
+        "overlap_minutes": overlap_minutes,
+        "slice_tokens": slice_tokens,
+        "overlap_tokens": overlap_tokens,
+        "stable": stable,
+        "overlap_context": overlap_context,
+        "context_tokens": context_tokens if overlap_context else None
+    }
+
+
+def plan_transcript_slices(transcript_path: str, transcript, settings: Dict) -> Dict:
+    """
+    Slice a transcript and work out which slices still need a summary.
+    
+    Args:
+        transcript_path: Path to the transcript file
+        transcript: The transcript's bytes, e.g. from map_transcript
+        settings: Slicing settings from get_slice_settings
+        
+    Returns:
+        Dictionary with the session date, slices directory, manifest,
+        transcript hash, settings, slices and their filenames, whether the
+        manifest is already current, the (index, slice info, summary path)
+        of the slices to reuse and to send, and the reusable summary texts
+        by content hash
+    """
     base_dir = os.path.dirname(os.path.dirname(transcript_path))  # Go up to the data directory
     date = os.path.basename(transcript_path).replace(".md", "")
     slices_dir = os.path.join(base_dir, "slices", date)
     os.makedirs(slices_dir, exist_ok=True)
     
-    processed_slices = []
+    manifest = SliceManifest(slices_dir)
+    transcript_hash = hashlib.sha256(transcript).hexdigest()
+    slices = list(iter_transcript_slices(transcript, settings["slice_minutes"], settings["overlap_minutes"],
+                                         settings["slice_tokens"], settings["overlap_tokens"],
+                                         settings["stable"]))
+    if settings["overlap_context"]:
+        # The summary also depends on where the overlap ends and how it is condensed
+        for slice_info in slices:
+            payload_key = f"{slice_info['content_hash']}:{slice_info['context_length']}:{settings['context_tokens']}"
+            slice_info['content_hash'] = hashlib.sha256(payload_key.encode()).hexdigest()
+    slice_filenames = [get_slice_filename(i, slice_info) for i, slice_info in enumerate(slices)]
+    unchanged = manifest.is_current(transcript_hash, settings)
     
-    # Process each slice
-    for i, slice_info in enumerate(slices):
-        slice_filename = f"slice_{i+1:03d}_{slice_info['start_time'].replace(':', '')}_to_{slice_info['end_time'].replace(':', '')}.md"
+    # Read every reusable summary before any file is overwritten, since
+    # inserted or removed slices shift the filenames of later ones
+    reused_text = {}
+    for slice_info, slice_filename in zip(slices, slice_filenames):
+        processed_text = manifest.read_summary(slice_info['content_hash'])
         slice_path = os.path.join(slices_dir, slice_filename)
-        
-        # Check if this slice has already been processed
-        if os.path.exists(slice_path):
-            print(f"Slice {i+1}/{len(slices)} already processed, skipping")
+        if processed_text is None and not manifest.exists and os.path.exists(slice_path):
+            # Slices processed before there was a manifest are matched by filename
             with open(slice_path, "r") as f:
                 processed_text = f.read()
+        if processed_text is not None:
+            reused_text[slice_info['content_hash']] = processed_text
+    
+    reused = []
+    pending = []
+    for i, (slice_info, slice_filename) in enumerate(zip(slices, slice_filenames)):
+        slice_path = os.path.join(slices_dir, slice_filename)
+        if slice_info['content_hash'] in reused_text:
+            if not unchanged:
+                print(f"Slice {i+1}/{len(slices)} unchanged, reusing its summary")
+            reused.append((i, slice_info, slice_path))
         else:
-            print(f"Processing slice {i+1}/{len(slices)} ({slice_info['start_time']} to {slice_info['end_time']})...")
-            processed_text = process_transcript_slice(slice_info['text'], openai_api_key, model)
-            
-            # Save the processed slice
-            with open(slice_path, "w") as f:
-                f.write(processed_text)
-            
-            # Add a small delay to avoid rate limits
-            time.sleep(1)
+            pending.append((i, slice_info, slice_path))
+    
+    return {
+        "date": date,
+        "slices_dir": slices_dir,
+        "manifest": manifest,
+        "transcript_hash": transcript_hash,
+        "settings": settings,
+        "slices": slices,
+        "slice_filenames": slice_filenames,
+        "unchanged": unchanged,
+        "reused": reused,
+        "pending": pending,
+        "reused_text": reused_text
+    }
+
+
+def write_slice_summary(manifest: SliceManifest, content_hash: str, slice_path: str, processed_text: str) -> None:
+    """
+    Write a slice summary to its file and record it in the manifest.
+    
+    Args:
+        manifest: The session's slice manifest
+        content_hash: Hash of the slice's payload
+        slice_path: Path of the slice's summary file
+        processed_text: The summary
+    """
+    # Reused summaries already in place aren't rewritten
+    if manifest.summaries.get(content_hash) != os.path.basename(slice_path) or not os.path.exists(slice_path):
+        with open(slice_path, "w") as f:
+            f.write(processed_text)
+    manifest.record(content_hash, os.path.basename(slice_path))
+
+
+def finish_transcript_slices(plan: Dict, sent: int, failed: int = 0) -> None:
+    """
+    Mark a transcript's slices current once every slice has a summary.
+    
+    Args:
+        plan: Plan from plan_transcript_slices
+        sent: Number of slices that were sent for summarizing
+        failed: Number of those that got no summary
+    """
+    slices = plan["slices"]
+    if failed:
+        # Keep the manifest's old transcript hash so the next run retries the missing slices
+        print(f"{failed} of {len(slices)} slices failed; run again to retry them")
+        return
+    
+    removed = plan["manifest"].finish(plan["transcript_hash"], plan["settings"],
+                                      [(s['content_hash'], name) for s, name in zip(slices, plan["slice_filenames"])])
+    if plan["unchanged"]:
+        print(f"Transcript {plan['date']} is unchanged; all {len(slices)} slice summaries are current")
+    else:
+        print(f"Sent {sent} of {len(slices)} slices; reused {len(slices) - sent} summaries"
+              f"{f', removed {len(removed)} outdated ones' if removed else ''}")
+
+
+def process_transcript_slices(transcript_path: str, openai_api_key: str, model: str = "gpt-4.1", 
+                             slice_minutes: int = 15, overlap_minutes: int = 5,
+                             slice_tokens: Optional[int] = None,
+                             overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                             stable: bool = False, overlap_context: bool = False,
+                             context_tokens: int = DEFAULT_CONTEXT_TOKENS,
+                             concurrency: int = 1,
+                             summarizer: Optional[SliceSummarizer] = None) -> List[Dict]:
+    """
+    Process a transcript by slicing it and sending each slice to OpenAI for processing.
+    
+    A manifest in the slices directory records the hash of the text each
+    summary was made from; only slices whose text changed since the last
+    run are sent, and summaries no slice uses any more are deleted. Slices
+    are sent concurrently and each summary is written under its slice's
+    filename as soon as it arrives, so an interrupted run resumes where it
+    stopped.
+    
+    Args:
+        transcript_path: Path to the transcript file
+        openai_api_key: OpenAI API key
+        model: The OpenAI model to use
+        slice_minutes: Size of each slice in minutes
+        overlap_minutes: Overlap between slices in minutes
+        slice_tokens: Slice by this estimated token budget per slice instead
+            of by minutes, cutting on speaker turns
+        overlap_tokens: Estimated token budget of the overlap when slicing by tokens
+        stable: Use content-defined slice boundaries, so that editing the
+            transcript only changes the slices around the edit
+        overlap_context: Send the overlap with the previous slice as a
+            condensed "context only" block, so only the new part of each
+            slice is summarized in full
+        context_tokens: Estimated token budget of that context block
+        concurrency: Maximum number of slices summarized at once, when no
+            summarizer is given
+        summarizer: Summarizer shared by a whole run (default: one made for
+            this transcript, whose model is used instead of model)
+        
+    Returns:
+        List of dictionaries containing processed slices
+    """
+    settings = get_slice_settings(slice_minutes, overlap_minutes, slice_tokens, overlap_tokens,
+                                  stable, overlap_context, context_tokens)
+    
+    # Slice over a memory map of the transcript; each slice's text is only
+    # read when it is sent for processing
+    with map_transcript(transcript_path) as transcript:
+        plan = plan_transcript_slices(transcript_path, transcript, settings)
+        slices = plan["slices"]
+        processed_slices: List[Optional[Dict]] = [None] * len(slices)
+        
+        def finish_slice(index: int, slice_info: Dict, slice_path: str, processed_text: str) -> None:
+            write_slice_summary(plan["manifest"], slice_info['content_hash'], slice_path, processed_text)
+            processed_slices[index] = {
+                "start_time": slice_info['start_time'],
+                "end_time": slice_info['end_time'],
+                "processed_text": processed_text,
+                "file_path": slice_path
+            }
         
-        processed_slices.append({
-            "start_time": slice_info['start_time'],
-            "end_time": slice_info['end_time'],
-            "processed_text": processed_text,
-            "file_path": slice_path
-        })
+        for index, slice_info, slice_path in plan["reused"]:
+            finish_slice(index, slice_info, slice_path, plan["reused_text"][slice_info['content_hash']])
+        
+        pending = plan["pending"]
+        failed, full_tokens, payload_tokens = 0, 0, 0
+        if pending:
+            own_summarizer = summarizer is None
+            if own_summarizer:
+                summarizer = SliceSummarizer(openai_api_key, model, concurrency)
+            print(f"Sending {len(pending)} of {len(slices)} slices, up to {summarizer.concurrency} at a time...")
+            try:
+                failed, full_tokens, payload_tokens = summarizer.run(_summarize_slices(
+                    pending, transcript, summarizer, overlap_context, context_tokens, finish_slice))
+            finally:
+                if own_summarizer:
+                    print(summarizer.report() or "No OpenAI calls were made")
+                    summarizer.close()
+    
+    finish_transcript_slices(plan, sent=len(pending), failed=failed)
+    if full_tokens:
+        print(f"Overlap sent as condensed context: {full_tokens:,} -> {payload_tokens:,} estimated "
+              f"transcript tokens ({1 - payload_tokens / full_tokens:.1%} saved)")
     
-    return processed_slices
+    return [processed for processed in processed_slices if processed]
+
+
+def _cleaned_transcript_path(transcript_path: str) -> str:
+    """Clean a transcript if needed, report the tokens saved, and return the cleaned copy's path."""
+    clean_path, stats = get_clean_transcript(transcript_path)
+    saved = stats["tokens_before"] - stats["tokens_after"]
+    print(f"{'Cleaned transcript is current' if stats['cached'] else 'Cleaned transcript'}: "
+          f"{stats['tokens_before']:,} -> {stats['tokens_after']:,} estimated tokens "
+          f"({saved:,} saved, {saved / max(stats['tokens_before'], 1):.1%})")
+    return clean_path
 
 
-def process_all_transcripts_to_slices(openai_api_key: str) -> None:
+def process_all_transcripts_to_slices(openai_api_key: str, slice_tokens: Optional[int] = None,
+                                      overlap_tokens: int = DEFAULT_OVERLAP_TOKENS,
+                                      stable: bool = False, clean: bool = False,
+                                      overlap_context: bool = False, concurrency: int = 1,
+                                      requests_per_minute: Optional[int] = None,
+                                      tokens_per_minute: Optional[int] = None,
+                                      batch: bool = False) -> None:
     """
     Process all existing transcripts into slices.
     
+    Transcripts whose slices are current are skipped; edited ones only have
+    their changed slices sent again.
+    
     Args:
         openai_api_key: OpenAI API key
+        slice_tokens: Slice by this estimated token budget per slice instead of by minutes
+        overlap_tokens: Estimated token budget of the overlap when slicing by tokens
+        stable: Use content-defined slice boundaries that stay put when a transcript is edited
+        clean: Slice the cleaned transcript (fillers, false starts, audio-event
+            tags and crosstalk removed) instead of the raw one
+        overlap_context: Send each slice's overlap with the previous one as a
+            condensed context block instead of in full
+        concurrency: Maximum number of slices summarized at once
+        requests_per_minute: Cap on summarization requests per minute
+        tokens_per_minute: Cap on estimated summarization tokens per minute
+        batch: Submit every pending slice as one Batch API job and wait for
+            it instead of sending slices synchronously
     """
     # Use a fixed model
     model = "gpt-4.1"
@@ -184,20 +558,45 @@ def process_all_transcripts_to_slices(openai_api_key: str) -> None:
     
     print(f"Found {len(transcript_files)} transcript files to process.\n")
     
-    # Process each transcript
-    for transcript_path in transcript_files:
-        date = os.path.basename(transcript_path).replace(".md", "")
-        slices_dir = os.path.join(raw_transcripts_dir, "slices", date)
-        
-        # Check if slices directory already exists and has files
-        if os.path.exists(slices_dir) and os.listdir(slices_dir):
-            print(f"Transcript {date} already has slices, skipping")
-            continue
+    settings = get_slice_settings(slice_tokens=slice_tokens, overlap_tokens=overlap_tokens,
+                                  stable=stable, overlap_context=overlap_context)
+    
+    if batch:
+        # Imported here because the batch module builds on this one
+        from .slice_batch import process_slices_in_batch
         
-        print(f"Processing transcript from {date}...")
-        try:
-            process_transcript_slices(transcript_path, openai_api_key)
-            print(f"Slice processing complete for {date}!\n")
-        except Exception as e:
-            print(f"Error processing transcript {date}: {str(e)}\n")
-            continue
+        paths = []
+        for transcript_path in sorted(transcript_files):
+            try:
+                paths.append(_cleaned_transcript_path(transcript_path) if clean else transcript_path)
+            except Exception as e:
+                print(f"Error cleaning transcript {transcript_path}: {str(e)}")
+        process_slices_in_batch(paths, openai_api_key, model, settings)
+        return
+    
+    # One client, roster and limiter for the whole run, so connections are
+    # reused and the limits hold across transcripts
+    summarizer = SliceSummarizer(openai_api_key, model, concurrency,
+                                 TokenBucketLimiter(requests_per_minute, tokens_per_minute))
+    
+    # Process each transcript; unchanged slices are reused from the manifest
+    try:
+        for transcript_path in sorted(transcript_files):
+            date = os.path.basename(transcript_path).replace(".md", "")
+            print(f"Processing transcript from {date}...")
+            try:
+                if clean:
+                    transcript_path = _cleaned_transcript_path(transcript_path)
+                process_transcript_slices(transcript_path, openai_api_key, model=model,
+                                          slice_tokens=slice_tokens, overlap_tokens=overlap_tokens,
+                                          stable=stable, overlap_context=overlap_context,
+                                          summarizer=summarizer)
+                print(f"Slice processing complete for {date}!\n")
+            except Exception as e:
+                print(f"Error processing transcript {date}: {str(e)}\n")
+                continue
+    finally:
+        report = summarizer.report()
+        if report:
+            print(report)
+        summarizer.close()
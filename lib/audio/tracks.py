@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+Multi-track recordings, where every player is recorded on a separate track
+(e.g. Craig on Discord).
+
+Tracks are named YYMMDD_####_<Player>.<ext>; two or more tracks sharing the
+same YYMMDD_#### prefix form a track set. Each track is transcribed without
+diarization, and the word streams are merged by timestamp with the player
+names as speaker labels.
+"""
+
+import heapq
+import itertools
+import os
+import re
+from types import SimpleNamespace
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# YYMMDD_####_<Player>, with Craig's optional track number ("1-Erv")
+_TRACK_PATTERN = re.compile(r'^(\d{6}_\d{4})_(?:\d+-)?(.+)$')
+
+# Files written by split_long_audio_file aren't player tracks, but the parts
+# of a split track ("Erv_part01") still belong to the track's player
+_SPLIT_PART_PATTERN = re.compile(r'^part\d+$')
+_PART_SUFFIX_PATTERN = re.compile(r'_part\d+$')
+
+# Silence in seconds that ends a phrase of a track
+PHRASE_PAUSE = 1.0
+
+_SENTENCE_ENDS = ('.', '?', '!')
+
+
+def parse_track_filename(filename: str) -> Optional[Tuple[str, str]]:
+    """
+    Get the recording key and player name from a track filename.
+
+    Args:
+        filename: Path or name of an audio file
+
+    Returns:
+        Tuple of (recording key, player name), or None if the filename names
+        no player
+    """
+    stem = os.path.splitext(os.path.basename(filename))[0]
+    match = _TRACK_PATTERN.match(stem)
+    if not match or _SPLIT_PART_PATTERN.match(match.group(2)):
+        return None
+    player = _PART_SUFFIX_PATTERN.sub('', match.group(2))
+    return match.group(1), player.replace('_', ' ').strip()
+
+
+def find_track_sets(audio_files: List[str]) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Find the per-speaker track sets among a session's audio files.
+
+    Args:
+        audio_files: Paths of the session's audio files
+
+    Returns:
+        Dictionary mapping each recording key to its (player name, path)
+        tracks, with the parts of a split track in order under the same
+        player; files that aren't part of a set of two or more players are
+        left out
+    """
+    candidates: Dict[str, List[Tuple[str, str]]] = {}
+    for audio_file in audio_files:
+        parsed = parse_track_filename(audio_file)
+        if parsed:
+            key, player = parsed
+            candidates.setdefault(key, []).append((player, audio_file))
+
+    return {key: sorted(tracks) for key, tracks in candidates.items() if _is_track_set(tracks)}
+
+
+def _is_track_set(tracks: List[Tuple[str, str]]) -> bool:
+    """Check that files sharing a recording key are the tracks of two or more players."""
+    paths_by_player: Dict[str, List[str]] = {}
+    for player, path in tracks:
+        paths_by_player.setdefault(player, []).append(path)
+    if len(paths_by_player) < 2:
+        return False
+    # A player with several files is only allowed the parts of one split track
+    return all(
+        len(paths) == 1 or all(_PART_SUFFIX_PATTERN.search(os.path.splitext(path)[0]) for path in paths)
+        for paths in paths_by_player.values()
+    )
+
+
+def place_track_parts(parts: List[Tuple[str, float]]) -> Tuple[List[float], float]:
+    """
+    Place the files of a track set on the recording's timeline.
+
+    A track that was split into parts is laid back together: each part
+    starts where the player's earlier parts end. Both the transcript and the
+    speaker stats place tracks through this, so they always agree.
+
+    Args:
+        parts: (player name, length in seconds) of each file, in file order
+
+    Returns:
+        Tuple of (offset of each file within the recording, length of the
+        recording, i.e. of its longest track)
+    """
+    track_ends: Dict[str, float] = {}
+    offsets = []
+    for player, length in parts:
+        offset = track_ends.get(player, 0.0)
+        offsets.append(offset)
+        track_ends[player] = offset + length
+    return offsets, max(track_ends.values(), default=0.0)
+
+
+def _track_words(player: str, words: Iterable, time_map: Optional[Callable[[float], float]]) -> Iterator[SimpleNamespace]:
+    """Yield a track's words on the recording's timeline, labelled with the player."""
+    for word_info in words:
+        text = (getattr(word_info, 'text', None) or '').strip()
+        # Spacing is put back between the words of each phrase after the merge
+        if not text or getattr(word_info, 'type', None) == 'spacing':
+            continue
+        start = getattr(word_info, 'start', None) or 0.0
+        end = getattr(word_info, 'end', None) or 0.0
+        if time_map is not None:
+            start, end = time_map(start), time_map(end)
+        yield SimpleNamespace(
+            text=f" {text}",
+            start=start,
+            end=end,
+            type=getattr(word_info, 'type', None) or 'word',
+            speaker_id=player
+        )
+
+
+def _track_phrases(player: str, words: Iterable,
+                   time_map: Optional[Callable[[float], float]]) -> Iterator[List[SimpleNamespace]]:
+    """Group a track's words into phrases that end at a pause or the end of a sentence."""
+    phrase: List[SimpleNamespace] = []
+    for word in _track_words(player, words, time_map):
+        if phrase and word.start - phrase[-1].end > PHRASE_PAUSE:
+            yield phrase
+            phrase = []
+        phrase.append(word)
+        if word.text.endswith(_SENTENCE_ENDS):
+            yield phrase
+            phrase = []
+    if phrase:
+        yield phrase
+
+
+def merge_track_words(tracks: List[Tuple[str, Iterable, Optional[Callable[[float], float]]]]) -> SimpleNamespace:
+    """
+    Merge the word streams of a track set into one timeline.
+
+    Each track's words are grouped into phrases, and the phrases of all
+    tracks are interleaved by start time with a lazy heap-based k-way merge,
+    so crosstalk breaks the transcript between phrases rather than between
+    single words. A track may be given as several parts, one entry each,
+    with time maps that place them on the recording's timeline.
+
+    Args:
+        tracks: (player name, word objects, time map or None) for each track
+
+    Returns:
+        SimpleNamespace response whose words are a lazy iterator with the
+        player names as speaker IDs
+    """
+    streams = [_track_phrases(player, words, time_map) for player, words, time_map in tracks]
+    merged = heapq.merge(*streams, key=lambda phrase: phrase[0].start)
+    # The formatter only reads text when there are no words
+    return SimpleNamespace(text='', words=itertools.chain.from_iterable(merged))
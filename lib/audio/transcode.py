@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""
+Functions for transcoding recordings into a compact mono speech format before upload.
+Transcoded files are cached by the content hash of the original recording.
+"""
+
+import os
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from ..config import UPLOAD_CACHE_DIR
+
+# ffmpeg encoder settings for each supported upload codec
+UPLOAD_CODECS = {
+    "opus": {"extension": ".ogg", "args": ["-c:a", "libopus", "-b:a", "24k", "-application", "voip"]},
+    "flac": {"extension": ".flac", "args": ["-c:a", "flac", "-sample_fmt", "s16"]},
+}
+
+# Speech-to-text doesn't need more than this
+UPLOAD_SAMPLE_RATE = 16000
+
+
+def transcode_for_upload(audio_path: str, content_hash: str, codec: str = "opus") -> str:
+    """
+    Transcode a recording to mono 16 kHz speech audio for upload.
+
+    Only the channel layout, sample rate and codec change; nothing is trimmed,
+    so timestamps returned for the transcoded file are valid for the original.
+
+    Args:
+        audio_path: Path to the original recording
+        content_hash: Content hash of the original recording, used as the cache key
+        codec: Upload codec, one of UPLOAD_CODECS
+
+    Returns:
+        str: Path of the transcoded file
+    """
+    settings = UPLOAD_CODECS[codec]
+    output_path = os.path.join(UPLOAD_CACHE_DIR, f"{content_hash}{settings['extension']}")
+    if os.path.exists(output_path):
+        return output_path
+
+    os.makedirs(UPLOAD_CACHE_DIR, exist_ok=True)
+    temp_path = os.path.join(UPLOAD_CACHE_DIR, f"{content_hash}.tmp{settings['extension']}")
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y",
+         "-i", audio_path,
+         "-map", "0:a:0", "-ac", "1", "-ar", str(UPLOAD_SAMPLE_RATE),
+         *settings["args"],
+         temp_path],
+        check=True
+    )
+    os.replace(temp_path, output_path)
+    return output_path
+
+
+def transcode_files_for_upload(audio_files: List[str], content_hashes: List[str], codec: str = "opus",
+                               max_workers: Optional[int] = None) -> Dict[str, str]:
+    """
+    Transcode several recordings in parallel.
+
+    Each transcode runs in its own ffmpeg process; the pool only decides how
+    many run at once. Files that fail to transcode are uploaded as recorded.
+
+    Args:
+        audio_files: Paths of the original recordings
+        content_hashes: Content hash of each recording, in the same order
+        codec: Upload codec, one of UPLOAD_CODECS
+        max_workers: Maximum concurrent transcodes (default: number of CPUs)
+
+    Returns:
+        Dictionary mapping each original path to the path to upload
+    """
+    if not audio_files:
+        return {}
+
+    workers = max_workers or os.cpu_count() or 1
+    print(f"Transcoding {len(audio_files)} files to mono {UPLOAD_SAMPLE_RATE // 1000} kHz {codec}...")
+
+    upload_paths = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(transcode_for_upload, audio_file, content_hash, codec): audio_file
+            for audio_file, content_hash in zip(audio_files, content_hashes)
+        }
+        for future, audio_file in futures.items():
+            try:
+                upload_paths[audio_file] = future.result()
+            except Exception as e:
+                print(f"Error transcoding {os.path.basename(audio_file)}, uploading original: {str(e)}",
+                      file=sys.stderr)
+                upload_paths[audio_file] = audio_file
+
+    original_bytes = sum(os.path.getsize(f) for f in upload_paths)
+    upload_bytes = sum(os.path.getsize(p) for p in upload_paths.values())
+    if upload_bytes:
+        print(f"Upload size reduced from {original_bytes / 1e6:.1f} MB to {upload_bytes / 1e6:.1f} MB "
+              f"({original_bytes / upload_bytes:.1f}x smaller)")
+
+    return upload_paths
@@ -6,37 +6,52 @@ Includes functionality to convert API responses to formatted transcripts.
 
 import os
 import json
+import itertools
+import mimetypes
 import time
-from typing import Any, Tuple, Optional
+from types import SimpleNamespace
+from typing import Any, Iterator, TextIO, Tuple, Optional
 from elevenlabs.client import ElevenLabs
 
 
-def format_transcript(transcription_data, time_offset=0.0) -> str:
+def iter_transcript(transcription_data, time_offset=0.0, time_map=None,
+                    named_speakers: bool = False) -> Iterator[str]:
     """
     Format the transcription with speaker labels (Speaker 1, Speaker 2, etc.)
-    and timestamps for each speaker entry.
+    and timestamps for each speaker entry, one paragraph at a time.
+    
+    The pieces concatenate to exactly what format_transcript returns, but only
+    the paragraph being built is held in memory, so multi-hour transcripts can
+    be written straight to a file.
     
     Args:
         transcription_data: The raw transcription response from ElevenLabs API
         time_offset: Cumulative time offset in seconds from previous audio files
+        time_map: Optional function mapping word times in the uploaded audio
+            back to the original recording (used when silences were removed)
+        named_speakers: Use the speaker IDs as labels (e.g. player names
+            from track filenames) instead of numbering the speakers
         
-    Returns:
-        str: Formatted markdown transcript with speaker labels and timestamps
+    Yields:
+        str: Consecutive pieces of the formatted markdown transcript
     """
     if not transcription_data:
-        return "*No transcription data available*"
+        yield "*No transcription data available*"
+        return
     
-    # Initialize markdown output with no heading
-    markdown = []
+    # Words may be a list or a lazy iterator, so peek instead of testing truthiness
+    words = iter(getattr(transcription_data, 'words', None) or [])
+    first_word = next(words, None)
     
     # Check if we have text data as a fallback
-    if not hasattr(transcription_data, 'words') or not transcription_data.words:
+    if first_word is None:
         # Fallback to simple text if no word-level data
         if hasattr(transcription_data, 'text'):
             text = transcription_data.text
         else:
             text = "No transcription text available"
-        return f"{''.join(markdown)}\n{text}"
+        yield f"\n{text}"
+        return
     
     current_speaker = None
     speaker_map = {}  # Maps speaker_id to Speaker 1, 2, 3...
@@ -44,7 +59,17 @@ def format_transcript(transcription_data, time_offset=0.0) -> str:
     current_paragraph = []
     last_end_time = 0
     
-    for word_info in transcription_data.words:
+    # Blank paragraphs are only written once a non-blank one follows them,
+    # which matches stripping the whole document
+    paragraphs_written = 0
+    pending_blank = 0
+    
+    def finish_paragraph():
+        # Doubled spaces can't span paragraphs, so cleaning each one on its
+        # own gives the same result as cleaning the joined document
+        return ''.join(current_paragraph).strip().replace('  ', ' ')
+    
+    for word_info in itertools.chain([first_word], words):
         # Skip if not a valid word info object
         if not hasattr(word_info, 'text'):
             continue
@@ -55,12 +80,19 @@ def format_transcript(transcription_data, time_offset=0.0) -> str:
         start_time = word_info.start if hasattr(word_info, 'start') else 0
         end_time = word_info.end if hasattr(word_info, 'end') else 0
         
+        # Map times back to the original recording if the upload was trimmed
+        if time_map is not None:
+            start_time = time_map(start_time)
+            end_time = time_map(end_time)
+        
         # Skip empty entries
         if not text:
             continue
         
         # Map speaker_id to Speaker 1, 2, 3...
-        if speaker_id not in speaker_map and speaker_id != 'unknown':
+        if named_speakers and speaker_id != 'unknown':
+            speaker_map[speaker_id] = speaker_id
+        elif speaker_id not in speaker_map and speaker_id != 'unknown':
             speaker_map[speaker_id] = f"Speaker {next_speaker_number}"
             next_speaker_number += 1
         
@@ -69,10 +101,18 @@ def format_transcript(transcription_data, time_offset=0.0) -> str:
         # Check for speaker change or long pause (more than 1.5 seconds)
         if (current_speaker != speaker_id or 
             (current_speaker and start_time - last_end_time > 1.5)):
-            # Add the current paragraph if it exists
+            # Emit the current paragraph if it exists
             if current_paragraph:
-                markdown.append(''.join(current_paragraph).strip() + '\n\n')
+                paragraph = finish_paragraph()
                 current_paragraph = []
+                if not paragraph:
+                    pending_blank += 1
+                else:
+                    if paragraphs_written:
+                        yield '\n\n' * (pending_blank + 1)
+                    yield paragraph
+                    paragraphs_written += 1
+                    pending_blank = 0
             
             # Add speaker label with timestamp if speaker changed
             if current_speaker != speaker_id:
@@ -91,17 +131,47 @@ def format_transcript(transcription_data, time_offset=0.0) -> str:
         current_paragraph.append(text)
         last_end_time = end_time
     
-    # Add the last paragraph if it exists
+    # Emit the last paragraph if it exists
     if current_paragraph:
-        markdown.append(''.join(current_paragraph).strip() + '\n\n')
-    
-    # Join everything and clean up
-    content = ''.join(markdown)
+        paragraph = finish_paragraph()
+        if paragraph:
+            if paragraphs_written:
+                yield '\n\n' * (pending_blank + 1)
+            yield paragraph
+
+
+def format_transcript(transcription_data, time_offset=0.0, time_map=None) -> str:
+    """
+    Format the transcription with speaker labels (Speaker 1, Speaker 2, etc.)
+    and timestamps for each speaker entry.
     
-    # Clean up common formatting issues
-    clean_content = content.replace('  ', ' ').strip()
+    Args:
+        transcription_data: The raw transcription response from ElevenLabs API
+        time_offset: Cumulative time offset in seconds from previous audio files
+        time_map: Optional function mapping word times in the uploaded audio
+            back to the original recording (used when silences were removed)
+        
+    Returns:
+        str: Formatted markdown transcript with speaker labels and timestamps
+    """
+    return ''.join(iter_transcript(transcription_data, time_offset, time_map))
+
+
+def write_transcript(output: TextIO, transcription_data, time_offset=0.0, time_map=None,
+                     named_speakers: bool = False) -> None:
+    """
+    Write the formatted transcription to an open file paragraph by paragraph.
     
-    return clean_content
+    Args:
+        output: Text file to write to
+        transcription_data: The raw transcription response from ElevenLabs API
+        time_offset: Cumulative time offset in seconds from previous audio files
+        time_map: Optional function mapping word times in the uploaded audio
+            back to the original recording (used when silences were removed)
+        named_speakers: Use the speaker IDs as labels instead of numbering them
+    """
+    for piece in iter_transcript(transcription_data, time_offset, time_map, named_speakers):
+        output.write(piece)
 
 
 def save_json(data, filename):
@@ -111,13 +181,30 @@ def save_json(data, filename):
             json.dump(data.dict(), f, indent=2, ensure_ascii=False)
         elif isinstance(data, dict):
             json.dump(data, f, indent=2, ensure_ascii=False)
+        elif isinstance(data, SimpleNamespace):
+            # Stitched or reloaded responses keep their words as namespaces too
+            response_dict = {**vars(data), "words": [vars(w) for w in getattr(data, 'words', [])]}
+            json.dump(response_dict, f, indent=2, ensure_ascii=False)
         else:
             json.dump({"response": str(data)}, f, indent=2, ensure_ascii=False)
 
 
+def is_failed_transcription(transcription_data) -> bool:
+    """
+    Check whether a transcribe_audio result is the error placeholder.
+    
+    Args:
+        transcription_data: Raw response returned by transcribe_audio
+        
+    Returns:
+        bool: True if the transcription failed
+    """
+    return isinstance(transcription_data, dict)
+
+
 def transcribe_audio(file_path: str, api_key: str, num_speakers: int = 6, debug: bool = False, 
                      output_file: Optional[str] = None, max_retries: int = 1, 
-                     timeout: int = 300) -> Tuple[Any, str]:
+                     timeout: int = 300, diarize: bool = True) -> Tuple[Any, str]:
     """
     Transcribe an audio file using the ElevenLabs API with speaker diarization.
     
@@ -129,6 +216,7 @@ def transcribe_audio(file_path: str, api_key: str, num_speakers: int = 6, debug:
         output_file: Optional output file path, or "skip_file_output" to skip
         max_retries: Maximum number of retry attempts for API calls (default: 1)
         timeout: Timeout in seconds for API calls (default: 300 seconds / 5 minutes)
+        diarize: Detect speakers; turn off for single-speaker tracks
         
     Returns:
         Tuple of (raw response object, formatted transcript)
@@ -138,29 +226,42 @@ def transcribe_audio(file_path: str, api_key: str, num_speakers: int = 6, debug:
     # Get the base name for output files
     base_name = os.path.splitext(os.path.basename(file_path))[0]
     
-    # Open the audio file in binary mode
-    with open(file_path, "rb") as audio_file:
-        audio_data = audio_file.read()
-    
-    # Initialize client with timeout
+    # Initialize client with timeout; ELEVENLABS_BASE_URL points it at a
+    # local stand-in for the speech-to-text endpoint when testing
     client = ElevenLabs(
         api_key=api_key,
-        timeout=timeout
+        timeout=timeout,
+        base_url=os.environ.get("ELEVENLABS_BASE_URL")
     )
     
     # Make the API request with all parameters directly
     try:
         print(f"Transcribing {os.path.basename(file_path)}...")
         
-        # Make the API request
-        transcription = client.speech_to_text.convert(
-            file=audio_data,
-            model_id="scribe_v1",
-            language_code="eng",
-            diarize=True,
-            num_speakers=num_speakers,
-            tag_audio_events=True
-        )
+        # Stream the upload from the open file handle rather than reading the
+        # whole recording into memory; the multipart body is read in small
+        # chunks and rewound for each retry
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        speaker_options = {"diarize": True, "num_speakers": num_speakers} if diarize else {"diarize": False}
+        with open(file_path, "rb") as audio_file:
+            # Make the API request, retrying transient failures
+            attempt = 0
+            while True:
+                try:
+                    transcription = client.speech_to_text.convert(
+                        file=(os.path.basename(file_path), audio_file, content_type),
+                        model_id="scribe_v1",
+                        language_code="eng",
+                        tag_audio_events=True,
+                        **speaker_options
+                    )
+                    break
+                except Exception as e:
+                    attempt += 1
+                    if attempt > max_retries:
+                        raise
+                    print(f"Attempt {attempt} for {os.path.basename(file_path)} failed ({str(e)}), retrying...")
+                    time.sleep(2 ** attempt)
         
         # Save the raw response only if debug mode is enabled
         if debug:
@@ -6,9 +6,49 @@ Utilities for file management and organization.
 import os
 import re
 import sys
-from typing import Dict, List, Tuple
+import json
+import struct
+import subprocess
+import threading
+import contextlib
+from typing import Dict, List, Optional, Set, Tuple
 import shutil
-from pydub import AudioSegment
+
+from .registry import compute_audio_hash, load_registry, lookup_cached_transcription, save_file_hashes
+from .tracks import find_track_sets
+from ..config import AUDIO_DURATIONS_PATH
+
+# Bitrates in kbps indexed by [MPEG-1?][layer][bitrate index]
+_MP3_BITRATES = {
+    True: {
+        1: [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        2: [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    },
+    False: {
+        1: [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        3: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    },
+}
+
+# Sample rates indexed by MPEG version bits, then sample rate index
+_MP3_SAMPLE_RATES = {
+    3: [44100, 48000, 32000],  # MPEG-1
+    2: [22050, 24000, 16000],  # MPEG-2
+    0: [11025, 12000, 8000],   # MPEG-2.5
+}
+
+# Durations are read from disk once per process; new ones are written back
+# straight away, or once at the end inside batched_duration_writes
+_duration_cache_lock = threading.Lock()
+_duration_cache: Optional[Dict[str, Dict]] = None
+_unsaved_durations: Dict[str, Dict] = {}
+_batched_writers = 0
+
+# Recording formats picked up from the audio directory; multi-track
+# recorders such as Craig export FLAC, Ogg or AAC tracks
+AUDIO_EXTENSIONS = ('.mp3', '.flac', '.ogg', '.m4a', '.wav')
 
 
 def extract_date_from_filename(filename: str) -> Tuple[str, str]:
@@ -35,26 +75,39 @@ def extract_date_from_filename(filename: str) -> Tuple[str, str]:
     return raw_date, formatted_date
 
 
-def group_audio_files_by_date(audio_dir: str) -> Dict[str, List[str]]:
+def group_audio_files_by_date(audio_dir: str, transcribed_dates: Optional[Set[str]] = None,
+                              registry: Optional[Dict[str, Dict]] = None) -> Dict[str, List[str]]:
     """
     Group audio files in the directory by their date.
     
+    Files of sessions without a transcript that are exact duplicates of a
+    file already seen (e.g. the same recording exported twice) are dropped,
+    along with any session left with no files. Sessions that already have a
+    transcript are grouped without hashing their files.
+    
+    Per-player tracks named YYMMDD_####_<Player> are reported as multi-track
+    recordings; they are transcribed without diarization and merged later.
+    
     Args:
         audio_dir: Path to directory containing audio files
+        transcribed_dates: Dates (YYYY-MM-DD) that already have a transcript
+        registry: Audio registry loaded for the scan; if not given, it is
+            loaded here and new hashes are saved once at the end
         
     Returns:
         Dictionary mapping formatted dates (YYYY-MM-DD) to lists of audio file paths
     """
     audio_files_by_date = {}
+    transcribed_dates = transcribed_dates or set()
     
     # Ensure the directory exists
     if not os.path.exists(audio_dir):
         print(f"Warning: audio directory {audio_dir} does not exist")
         return audio_files_by_date
     
-    # Get all MP3 files
+    # Get all audio files
     for filename in os.listdir(audio_dir):
-        if filename.lower().endswith('.mp3') and re.match(r'^\d{6}_\d{4}', filename):
+        if filename.lower().endswith(AUDIO_EXTENSIONS) and re.match(r'^\d{6}_\d{4}', filename):
             file_path = os.path.join(audio_dir, filename)
             try:
                 raw_date, formatted_date = extract_date_from_filename(filename)
@@ -64,18 +117,272 @@ def group_audio_files_by_date(audio_dir: str) -> Dict[str, List[str]]:
             except ValueError as e:
                 print(f"Warning: Skipping file {filename}: {str(e)}")
     
-    # Sort files within each date group
-    for date, files in audio_files_by_date.items():
-        audio_files_by_date[date] = sorted(files)
+    save_registry = registry is None
+    if registry is None:
+        registry = load_registry()
+    
+    # Files of transcribed sessions are known to the registry by name
+    transcribed_files = {
+        os.path.basename(file_path): date
+        for date in transcribed_dates for file_path in audio_files_by_date.get(date, [])
+    }
+    
+    # Sort files within each date group, dropping exact duplicates of a file
+    # that was already seen
+    seen_hashes = {}
+    for date in sorted(audio_files_by_date):
+        files = sorted(audio_files_by_date[date])
+        if date in transcribed_dates:
+            audio_files_by_date[date] = files
+            continue
+        
+        unique_files = []
+        for file_path in files:
+            content_hash = compute_audio_hash(file_path, registry)
+            duplicate_of = seen_hashes.get(content_hash)
+            if duplicate_of is None:
+                registered = registry["hashes"].get(content_hash, {}).get("files", [])
+                duplicate_of = next((name for name in registered
+                                     if transcribed_files.get(name, date) != date), None)
+            if duplicate_of is not None:
+                print(f"Warning: Skipping {os.path.basename(file_path)}, it is a duplicate of "
+                      f"{os.path.basename(duplicate_of)}")
+                continue
+            seen_hashes[content_hash] = file_path
+            unique_files.append(file_path)
+        
+        if not unique_files:
+            print(f"Warning: Skipping session {date}, all of its files are duplicates of other sessions")
+            del audio_files_by_date[date]
+            continue
+        audio_files_by_date[date] = unique_files
+        
+        for key, tracks in sorted(find_track_sets(unique_files).items()):
+            players = sorted({player for player, _ in tracks})
+            print(f"Session {date}: multi-track recording {key} with {len(players)} tracks ({', '.join(players)})")
+    
+    if save_registry:
+        save_file_hashes(registry)
     
     return audio_files_by_date
 
 
+def _read_mp3_duration(audio_path: str) -> Optional[float]:
+    """
+    Read the duration of an MP3 file from its frame headers without decoding.
+    
+    Uses the Xing/Info or VBRI frame count when present, and otherwise
+    assumes a constant bitrate and derives the duration from the file size.
+    
+    Args:
+        audio_path: Path to the MP3 file
+        
+    Returns:
+        float: Duration in seconds, or None if no valid frame header was found
+    """
+    file_size = os.path.getsize(audio_path)
+    
+    with open(audio_path, "rb") as f:
+        header = f.read(10)
+        audio_start = 0
+        
+        # Skip an ID3v2 tag (its size is a 28-bit syncsafe integer)
+        if len(header) == 10 and header[:3] == b"ID3":
+            tag_size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+            audio_start = 10 + tag_size + (10 if header[5] & 0x10 else 0)
+        
+        f.seek(audio_start)
+        data = f.read(65536)
+        
+        # ID3v1 tags sit in the last 128 bytes
+        f.seek(max(0, file_size - 128))
+        has_id3v1 = f.read(3) == b"TAG"
+    
+    # Find the first frame sync whose header fields are valid
+    for pos in range(len(data) - 4):
+        if data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+            continue
+        
+        version_bits = (data[pos + 1] >> 3) & 0x03
+        layer_bits = (data[pos + 1] >> 1) & 0x03
+        bitrate_index = data[pos + 2] >> 4
+        sample_rate_index = (data[pos + 2] >> 2) & 0x03
+        channel_mode = data[pos + 3] >> 6
+        
+        if version_bits == 1 or layer_bits == 0 or bitrate_index in (0, 15) or sample_rate_index == 3:
+            continue
+        
+        is_mpeg1 = version_bits == 3
+        layer = 4 - layer_bits
+        bitrate = _MP3_BITRATES[is_mpeg1][layer][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[version_bits][sample_rate_index]
+        if layer == 1:
+            samples_per_frame = 384
+        elif layer == 3 and not is_mpeg1:
+            samples_per_frame = 576
+        else:
+            samples_per_frame = 1152
+        
+        # Look for a VBR header that records the total number of frames
+        frame = data[pos:pos + 200]
+        side_info = (32 if channel_mode != 3 else 17) if is_mpeg1 else (17 if channel_mode != 3 else 9)
+        xing_offset = 4 + side_info
+        if frame[xing_offset:xing_offset + 4] in (b"Xing", b"Info"):
+            flags = struct.unpack(">I", frame[xing_offset + 4:xing_offset + 8])[0]
+            if flags & 0x01:
+                frame_count = struct.unpack(">I", frame[xing_offset + 8:xing_offset + 12])[0]
+                return frame_count * samples_per_frame / sample_rate
+        if frame[36:40] == b"VBRI":
+            frame_count = struct.unpack(">I", frame[50:54])[0]
+            return frame_count * samples_per_frame / sample_rate
+        
+        # Constant bitrate: the audio payload size gives the duration
+        audio_bytes = file_size - audio_start - pos - (128 if has_id3v1 else 0)
+        return audio_bytes * 8 / bitrate
+    
+    return None
+
+
+def _probe_audio_duration(audio_path: str) -> float:
+    """
+    Get the duration of an audio file from its container headers using ffprobe.
+    
+    Args:
+        audio_path: Path to the audio file
+        
+    Returns:
+        float: Duration in seconds
+    """
+    result = subprocess.run(
+        ["ffprobe", "-v", "error", "-show_entries", "format=duration", "-of", "json", audio_path],
+        capture_output=True, text=True, check=True
+    )
+    return float(json.loads(result.stdout)["format"]["duration"])
+
+
+def _load_duration_cache() -> Dict[str, Dict]:
+    """Load the duration cache, treating a missing or corrupt file as empty."""
+    if not os.path.exists(AUDIO_DURATIONS_PATH):
+        return {}
+    try:
+        with open(AUDIO_DURATIONS_PATH, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_duration_cache() -> None:
+    """
+    Merge the unsaved durations into the cache file through a temporary file.
+    
+    The file is read again first so durations saved by another process are
+    kept. Must be called with _duration_cache_lock held.
+    """
+    if not _unsaved_durations:
+        return
+    cache = _load_duration_cache()
+    cache.update(_unsaved_durations)
+    temp_path = f"{AUDIO_DURATIONS_PATH}.{os.getpid()}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(temp_path, AUDIO_DURATIONS_PATH)
+    _unsaved_durations.clear()
+
+
+@contextlib.contextmanager
+def batched_duration_writes():
+    """
+    Write the durations read inside this block to the cache file once, at the end.
+    
+    Safe to use from several threads at once; the file is written when the
+    last block exits.
+    """
+    global _batched_writers
+    with _duration_cache_lock:
+        _batched_writers += 1
+    try:
+        yield
+    finally:
+        with _duration_cache_lock:
+            _batched_writers -= 1
+            if not _batched_writers:
+                _save_duration_cache()
+
+
+def get_audio_duration(audio_path: str) -> float:
+    """
+    Get the duration of an audio file without decoding it.
+    
+    MP3 frame headers are parsed directly, with ffprobe as the fallback for
+    other formats. Results are cached by path, size and modification time so
+    repeated scans of the audio directory don't touch the files again.
+    
+    Args:
+        audio_path: Path to the audio file
+        
+    Returns:
+        float: Duration in seconds
+    """
+    global _duration_cache
+    stat = os.stat(audio_path)
+    cache_key = os.path.abspath(audio_path)
+    
+    with _duration_cache_lock:
+        if _duration_cache is None:
+            _duration_cache = _load_duration_cache()
+        entry = _duration_cache.get(cache_key)
+    if entry and entry["size"] == stat.st_size and entry["mtime"] == stat.st_mtime:
+        return entry["duration"]
+    
+    duration = None
+    if audio_path.lower().endswith(".mp3"):
+        duration = _read_mp3_duration(audio_path)
+    if duration is None:
+        duration = _probe_audio_duration(audio_path)
+    
+    with _duration_cache_lock:
+        entry = {"size": stat.st_size, "mtime": stat.st_mtime, "duration": duration}
+        _duration_cache[cache_key] = entry
+        _unsaved_durations[cache_key] = entry
+        if not _batched_writers:
+            _save_duration_cache()
+    
+    return duration
+
+
+def extract_audio_chunk(audio_path: str, start_sec: float, duration_sec: float, output_path: str) -> str:
+    """
+    Copy a time range of an audio file into a new file without re-encoding.
+    
+    Args:
+        audio_path: Path to the source audio file
+        start_sec: Start of the range in seconds
+        duration_sec: Length of the range in seconds
+        output_path: Path to write the chunk to
+        
+    Returns:
+        str: The output path
+    """
+    subprocess.run(
+        ["ffmpeg", "-v", "error", "-y",
+         "-ss", f"{start_sec:.3f}", "-t", f"{duration_sec:.3f}",
+         "-i", audio_path,
+         "-map", "0:a", "-c", "copy",
+         output_path],
+        check=True
+    )
+    return output_path
+
+
 def split_long_audio_file(audio_path: str, max_duration_sec: int = 6900) -> List[str]:
     """
     Split a long audio file into segments of at most max_duration_sec.
     Default is 6900 seconds (1 hour 55 minutes) to stay under Eleven Labs 2-hour limit.
     
+    The file is cut at frame boundaries with ffmpeg's segment muxer in stream
+    copy mode, so nothing is decoded or re-encoded and memory use does not
+    depend on the length of the recording.
+    
     Args:
         audio_path: Path to the audio file
         max_duration_sec: Maximum duration of each segment in seconds
@@ -83,15 +390,14 @@ def split_long_audio_file(audio_path: str, max_duration_sec: int = 6900) -> List
     Returns:
         List of paths to the generated segment files
     """
-    # Load the audio file
+    # Read the duration from the file headers
     try:
-        audio = AudioSegment.from_mp3(audio_path)
+        duration_sec = get_audio_duration(audio_path)
     except Exception as e:
-        print(f"Error loading audio file {audio_path}: {str(e)}", file=sys.stderr)
+        print(f"Error reading audio file {audio_path}: {str(e)}", file=sys.stderr)
         return [audio_path]  # Return the original file if there's an error
     
     # If the file is already short enough, return the original path
-    duration_sec = len(audio) / 1000  # pydub duration is in milliseconds
     if duration_sec <= max_duration_sec:
         return [audio_path]
     
@@ -105,28 +411,36 @@ def split_long_audio_file(audio_path: str, max_duration_sec: int = 6900) -> List
     os.makedirs(backups_dir, exist_ok=True)
     backup_path = os.path.join(backups_dir, f"{base_name}{file_ext}")
     
-    # Calculate how many segments we need
-    segment_count = int(duration_sec / max_duration_sec) + 1
-    segment_paths = []
+    # Create the segments directly in the audio folder, in the original container
+    # Format: original_name_partXX.mp3
+    segment_pattern = os.path.join(base_dir, f"{base_name}_part%02d{file_ext}")
+    try:
+        subprocess.run(
+            ["ffmpeg", "-v", "error", "-y",
+             "-i", audio_path,
+             "-map", "0:a", "-c", "copy",
+             "-f", "segment",
+             "-segment_time", str(max_duration_sec),
+             "-segment_start_number", "1",
+             "-reset_timestamps", "1",
+             segment_pattern],
+            check=True
+        )
+        all_segments_successful = True
+    except Exception as e:
+        print(f"Error splitting {audio_path}: {str(e)}", file=sys.stderr)
+        all_segments_successful = False
     
-    # Split the audio into segments
-    all_segments_successful = True
-    for i in range(segment_count):
-        start_time = i * max_duration_sec * 1000  # Convert to milliseconds
-        end_time = min((i + 1) * max_duration_sec * 1000, len(audio))
-        segment = audio[start_time:end_time]
-        
-        # Create a filename for the segment directly in the audio folder
-        # Format: original_name_partXX.mp3
-        segment_file = os.path.join(base_dir, f"{base_name}_part{i+1:02d}.mp3")
-        
-        try:
-            segment.export(segment_file, format="mp3")
-            segment_paths.append(segment_file)
-            print(f"Created segment {i+1}/{segment_count}: {segment_file}")
-        except Exception as e:
-            print(f"Error creating segment {i+1}: {str(e)}", file=sys.stderr)
-            all_segments_successful = False
+    # Collect the segments ffmpeg wrote, in order
+    segment_regex = re.compile(rf'^{re.escape(base_name)}_part(\d{{2}}){re.escape(file_ext)}$')
+    segment_paths = sorted(
+        os.path.join(base_dir, f) for f in os.listdir(base_dir) if segment_regex.match(f)
+    )
+    for i, segment_file in enumerate(segment_paths):
+        print(f"Created segment {i+1}/{len(segment_paths)}: {segment_file}")
+    
+    if not segment_paths:
+        return [audio_path]
     
     # If all segments were created successfully, move the original file to backups
     if all_segments_successful:
@@ -150,9 +464,6 @@ def find_unprocessed_sessions(audio_dir: str, transcripts_dir: str) -> Dict[str,
     Returns:
         Dictionary mapping dates to lists of audio file paths for unprocessed sessions
     """
-    # Group audio files by date
-    audio_files_by_date = group_audio_files_by_date(audio_dir)
-    
     # Get list of existing transcript files from Raw Transcripts directory only
     transcript_files = []
     raw_transcripts_dir = os.path.join(transcripts_dir, "raw-transcripts")
@@ -169,17 +480,24 @@ def find_unprocessed_sessions(audio_dir: str, transcripts_dir: str) -> Dict[str,
         if date_match:
             transcript_dates.add(date_match.group(1))
     
-    # Find dates that have audio files but no transcript
+    # Group audio files by date, hashing only the sessions still to process.
+    # The registry is read once for the whole scan and written once at the end.
+    registry = load_registry()
+    audio_files_by_date = group_audio_files_by_date(audio_dir, transcript_dates, registry)
+    
+    # Find dates that have audio files but no transcript. Long files are
+    # split later, right before they are uploaded, so scanning stays cheap.
     unprocessed_sessions = {}
     for date, files in audio_files_by_date.items():
         if date not in transcript_dates:
-            # Process long files to ensure they're under the 2-hour limit
-            processed_files = []
-            for file_path in files:
-                # Check and split files if they're too long
-                segment_paths = split_long_audio_file(file_path)
-                processed_files.extend(segment_paths)
+            unprocessed_sessions[date] = files
             
-            unprocessed_sessions[date] = processed_files
+            # Known content is reused from the cache instead of being uploaded
+            known_files = [f for f in files
+                           if lookup_cached_transcription(compute_audio_hash(f, registry), registry)]
+            if known_files:
+                print(f"Session {date}: {len(known_files)} of {len(files)} files were already transcribed "
+                      f"and will be reused")
     
+    save_file_hashes(registry)
     return unprocessed_sessions
@@ -0,0 +1,226 @@
+#!/usr/bin/env python
+"""
+Compact columnar cache of word-level transcription responses.
+
+Every response is stored as a set of NumPy arrays in an .npz file so that
+transcripts can be re-formatted offline without paying to transcribe again.
+"""
+
+import os
+from types import SimpleNamespace
+from typing import Any, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import TRANSCRIPTION_CACHE_DIR
+
+
+class WordArrays:
+    """Word-level transcription data held as parallel arrays."""
+
+    def __init__(self, texts: List[str], start: np.ndarray, end: np.ndarray,
+                 speaker: np.ndarray, word_type: np.ndarray,
+                 speakers: List[str], types: List[str],
+                 remap: Optional[List[Tuple[float, float, float]]] = None):
+        self.texts = texts
+        self.start = start
+        self.end = end
+        self.speaker = speaker        # index into speakers, -1 for unknown
+        self.word_type = word_type    # index into types
+        self.speakers = speakers
+        self.types = types
+        self.remap = remap            # silence-trimming remap table, if any
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def from_transcription(cls, transcription_data: Any,
+                           remap: Optional[List[Tuple[float, float, float]]] = None) -> "WordArrays":
+        """
+        Build the arrays from a transcription response.
+
+        Args:
+            transcription_data: Response from the ElevenLabs API (or a stand-in
+                with the same word attributes)
+            remap: Remap table if the uploaded audio had silences removed
+
+        Returns:
+            WordArrays holding every word of the response
+        """
+        texts, starts, ends, speaker_idx, type_idx = [], [], [], [], []
+        speakers: List[str] = []
+        types: List[str] = []
+        speaker_lookup = {}
+        type_lookup = {}
+
+        for word_info in getattr(transcription_data, 'words', None) or []:
+            if not hasattr(word_info, 'text'):
+                continue
+            speaker_id = getattr(word_info, 'speaker_id', None) or 'unknown'
+            word_type = getattr(word_info, 'type', None) or 'word'
+
+            if speaker_id == 'unknown':
+                speaker_idx.append(-1)
+            else:
+                if speaker_id not in speaker_lookup:
+                    speaker_lookup[speaker_id] = len(speakers)
+                    speakers.append(speaker_id)
+                speaker_idx.append(speaker_lookup[speaker_id])
+
+            if word_type not in type_lookup:
+                type_lookup[word_type] = len(types)
+                types.append(word_type)
+            type_idx.append(type_lookup[word_type])
+
+            texts.append(word_info.text or '')
+            starts.append(getattr(word_info, 'start', None) or 0.0)
+            ends.append(getattr(word_info, 'end', None) or 0.0)
+
+        return cls(
+            texts,
+            np.asarray(starts, dtype=np.float64),
+            np.asarray(ends, dtype=np.float64),
+            np.asarray(speaker_idx, dtype=np.int16),
+            np.asarray(type_idx, dtype=np.int8),
+            speakers,
+            types,
+            remap
+        )
+
+    def save(self, cache_path: str) -> None:
+        """
+        Save the arrays to a compressed .npz file.
+
+        Word texts are stored as one concatenated string plus offsets so a
+        single long token doesn't widen every entry.
+
+        Args:
+            cache_path: Path of the .npz file to write
+        """
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        lengths = np.fromiter((len(t) for t in self.texts), dtype=np.int32, count=len(self.texts))
+        offsets = np.zeros(len(self.texts) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        # Write through a temporary file so an interrupted run never leaves a partial cache
+        temp_path = f"{cache_path}.tmp"
+        extra = {}
+        if self.remap:
+            extra["remap"] = np.asarray(self.remap, dtype=np.float64)
+        with open(temp_path, "wb") as f:
+            np.savez_compressed(
+                f,
+                **extra,
+                text=np.array(''.join(self.texts)),
+                text_offsets=offsets,
+                start=self.start,
+                end=self.end,
+                speaker=self.speaker,
+                type=self.word_type,
+                speakers=np.array(self.speakers, dtype=str),
+                types=np.array(self.types, dtype=str)
+            )
+        os.replace(temp_path, cache_path)
+
+    @classmethod
+    def load(cls, cache_path: str) -> "WordArrays":
+        """
+        Load arrays saved with save().
+
+        Args:
+            cache_path: Path of the .npz file
+
+        Returns:
+            WordArrays read from the cache
+        """
+        with np.load(cache_path) as data:
+            joined = str(data['text'])
+            offsets = data['text_offsets']
+            texts = [joined[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+            return cls(
+                texts,
+                data['start'],
+                data['end'],
+                data['speaker'],
+                data['type'],
+                [str(s) for s in data['speakers']],
+                [str(t) for t in data['types']],
+                [tuple(row) for row in data['remap'].tolist()] if 'remap' in data.files else None
+            )
+
+    def iter_words(self) -> Iterator[SimpleNamespace]:
+        """
+        Yield the words one at a time as objects with the response's word attributes.
+
+        Yields:
+            SimpleNamespace with text, start, end, type and speaker_id
+        """
+        for i, text in enumerate(self.texts):
+            speaker_index = int(self.speaker[i])
+            yield SimpleNamespace(
+                text=text,
+                start=float(self.start[i]),
+                end=float(self.end[i]),
+                type=self.types[int(self.word_type[i])],
+                speaker_id=self.speakers[speaker_index] if speaker_index >= 0 else 'unknown'
+            )
+
+    def to_transcription(self, lazy: bool = False) -> SimpleNamespace:
+        """
+        Rebuild a response object that format_transcript can consume.
+
+        Args:
+            lazy: Give the words as an iterator instead of a list, so that
+                streaming formatting never holds every word object at once
+
+        Returns:
+            SimpleNamespace with text, the word objects and the remap table
+            (None unless silences were removed before upload)
+        """
+        if lazy:
+            # The formatter only reads text when there are no words, when it is empty anyway
+            text = '' if not self.texts else None
+            return SimpleNamespace(text=text, words=self.iter_words(), remap=self.remap)
+        return SimpleNamespace(text=''.join(self.texts), words=list(self.iter_words()), remap=self.remap)
+
+
+def get_word_cache_path(date: str, audio_file: str) -> str:
+    """
+    Get the cache path for an audio file's word-level response.
+
+    Args:
+        date: Session date (YYYY-MM-DD)
+        audio_file: Path or name of the audio file
+
+    Returns:
+        str: Path of the .npz cache file
+    """
+    return os.path.join(TRANSCRIPTION_CACHE_DIR, date, f"{os.path.basename(audio_file)}.npz")
+
+
+def save_word_cache(transcription_data: Any, cache_path: str,
+                    remap: Optional[List[Tuple[float, float, float]]] = None) -> None:
+    """
+    Save a transcription response to the columnar cache.
+
+    Args:
+        transcription_data: Response from the ElevenLabs API
+        cache_path: Path of the .npz file to write
+        remap: Remap table if the uploaded audio had silences removed
+    """
+    WordArrays.from_transcription(transcription_data, remap).save(cache_path)
+
+
+def load_word_cache(cache_path: str, lazy: bool = False) -> SimpleNamespace:
+    """
+    Load a cached response in a form format_transcript can consume.
+
+    Args:
+        cache_path: Path of the .npz cache file
+        lazy: Give the words as an iterator instead of a list
+
+    Returns:
+        SimpleNamespace with text and the word objects
+    """
+    return WordArrays.load(cache_path).to_transcription(lazy)
@@ -45,13 +45,27 @@ PROMPTS_DIR = os.path.join(PROJECT_ROOT, "prompts")
 # Specific data subdirectories
 RAW_TRANSCRIPTS_DIR = os.path.join(DATA_DIR, "raw-transcripts")
 SLICES_DIR = os.path.join(DATA_DIR, "slices")
+CLEAN_TRANSCRIPTS_DIR = os.path.join(DATA_DIR, "clean-transcripts")
+SLICE_BATCHES_DIR = os.path.join(DATA_DIR, "slice-batches")
 DIGESTS_DIR = os.path.join(DATA_DIR, "digests")
+TRANSCRIPTION_CACHE_DIR = os.path.join(DATA_DIR, "transcription-cache")
+UPLOAD_CACHE_DIR = os.path.join(DATA_DIR, "upload-cache")
+STATS_DIR = os.path.join(DATA_DIR, "stats")
 
 # Specific output subdirectories
 SUMMARIES_DIR = os.path.join(OUTPUT_DIR, "summaries")
 IMAGES_DIR = os.path.join(OUTPUT_DIR, "images")
 PODCASTS_DIR = os.path.join(OUTPUT_DIR, "podcasts")
 
+# Cache of audio durations read from file headers
+AUDIO_DURATIONS_PATH = os.path.join(DATA_DIR, "audio-durations.json")
+
+# Registry of audio content hashes and their cached transcriptions
+AUDIO_REGISTRY_PATH = os.path.join(DATA_DIR, "audio-registry.json")
+
+# Campaign-wide rollup of per-session speaker stats
+CAMPAIGN_STATS_PATH = os.path.join(STATS_DIR, "campaign.json")
+
 # Database path
 CAMPAIGN_DB_PATH = os.path.join(DATA_DIR, "campaign-memory.db")
 
@@ -64,6 +78,7 @@ def ensure_directories():
         RAW_TRANSCRIPTS_DIR,
         SLICES_DIR,
         DIGESTS_DIR,
+        TRANSCRIPTION_CACHE_DIR,
         SUMMARIES_DIR,
         IMAGES_DIR,
         PODCASTS_DIR
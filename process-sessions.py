@@ -16,7 +16,11 @@ import os
 import sys
 import argparse
 from lib.audio.transcription import transcribe_audio
-from lib.audio.compilation import auto_process_sessions
+from lib.audio.compilation import auto_process_sessions, reformat_transcripts_from_cache
+from lib.audio.live import watch_live_session
+from lib.audio.analytics import update_all_session_stats
+from lib.audio.preflight import preflight_sessions
+from lib.audio.utils import find_unprocessed_sessions
 from lib.audio.summarization import process_all_transcripts_to_slices
 from lib.content.session_digest import process_all_sessions_to_digests
 from lib.content.digest_processing import process_all_digests
@@ -33,9 +37,58 @@ def main():
     parser = argparse.ArgumentParser(description="Process audio files to generate transcripts, slice them, and combine into session bibles.")
     parser.add_argument('--timeout', type=int, default=300, help='Timeout in seconds for API calls (default: 300)')
     parser.add_argument('--retries', type=int, default=2, help='Maximum number of retry attempts for API calls (default: 2)')
+    parser.add_argument('--transcription-workers', type=int, default=1, help='Number of audio files to transcribe concurrently per session (default: 1)')
+    parser.add_argument('--session-workers', type=int, default=1, help='Number of sessions to transcribe concurrently (default: 1)')
+    parser.add_argument('--max-uploads', type=int, default=4, help='Maximum number of audio uploads in flight across all sessions (default: 4)')
+    parser.add_argument('--chunks-per-file', type=int, default=1, help='Transcribe each audio file as this many overlapping chunks in parallel (default: 1)')
+    parser.add_argument('--transcode', choices=['opus', 'flac'], help='Transcode audio to mono 16 kHz opus or flac before uploading for transcription')
+    parser.add_argument('--trim-silence', action='store_true', help='Remove long silent stretches from audio before uploading for transcription')
+    parser.add_argument('--slice-tokens', type=int, help='Slice transcripts by this estimated token budget per slice, cutting on speaker turns, instead of 15-minute windows')
+    parser.add_argument('--overlap-tokens', type=int, default=1000, help='Estimated token budget of the overlap between token-budget slices (default: 1000)')
+    parser.add_argument('--slice-workers', type=int, default=4, help='Number of transcript slices summarized concurrently (default: 4)')
+    parser.add_argument('--requests-per-minute', type=int, help='Cap on slice summarization requests per minute')
+    parser.add_argument('--tokens-per-minute', type=int, help='Cap on estimated slice summarization tokens per minute')
+    parser.add_argument('--batch', action='store_true', help='Summarize pending slices through the OpenAI Batch API (cheaper, finishes within 24 hours) and wait for the results')
+    parser.add_argument('--clean-transcripts', action='store_true', help='Strip filler words, false starts, audio-event tags and one-word crosstalk from transcripts before slicing them')
+    parser.add_argument('--overlap-context', action='store_true', help='Send the overlap between slices as a condensed context-only block instead of repeating it in full')
+    parser.add_argument('--stable-slices', action='store_true', help='Use content-defined slice boundaries (around --slice-tokens, default 4000) so editing a transcript only re-sends the slices around the edit')
+    parser.add_argument('--preflight', action='store_true', help='Check unprocessed audio files locally and report what would be uploaded (skips normal processing)')
+    parser.add_argument('--skip-preflight', action='store_true', help='Upload audio without the local preflight check')
+    parser.add_argument('--reformat-transcripts', action='store_true', help='Rebuild raw transcripts offline from the cached word-level responses (skips normal processing)')
+    parser.add_argument('--live', metavar='DATE', help='Transcribe a session while it is recorded from rolling chunks in audio/live/DATE (skips normal processing)')
+    parser.add_argument('--live-idle-minutes', type=int, default=30, help='Finish a live session after this many minutes without new audio (default: 30)')
     parser.add_argument('--fix-spelling', action='store_true', help='Fix entity name spelling in existing outputs and campaign memory (skips normal processing)')
     args = parser.parse_args()
     
+    # Reformatting works entirely from the local cache, so no API keys are needed
+    if args.reformat_transcripts:
+        reformat_transcripts_from_cache(os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+        return
+    
+    # The preflight report is local too
+    if args.preflight:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+        unprocessed_sessions = find_unprocessed_sessions(os.path.join(base_dir, "audio"), os.path.join(base_dir, "data"))
+        if not unprocessed_sessions:
+            print("No unprocessed sessions found.")
+        elif len(preflight_sessions(unprocessed_sessions)) < len(unprocessed_sessions):
+            sys.exit(1)
+        return
+    
+    # Live mode only needs ElevenLabs; summarizing and publishing run afterwards as usual
+    if args.live:
+        eleven_api_key = os.environ.get("ELEVEN_API_KEY")
+        if not eleven_api_key:
+            print("Error: ELEVEN_API_KEY environment variable not set")
+            sys.exit(1)
+        transcripts_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+        if not watch_live_session(args.live, eleven_api_key, transcripts_dir,
+                                  idle_timeout=args.live_idle_minutes * 60,
+                                  timeout=args.timeout, retries=args.retries):
+            sys.exit(1)
+        update_all_session_stats()
+        return
+    
     # Get API keys from environment variables (after parsing args so --help works)
     openai_api_key = os.environ.get("OPENAI_API_KEY")
     if not openai_api_key:
@@ -80,12 +133,27 @@ def main():
     try:
         # Step 1: Process audio files into transcripts
         print("Step 1: Processing audio files into transcripts...")
-        auto_process_sessions(eleven_api_key, False, args.timeout, args.retries)
+        auto_process_sessions(eleven_api_key, False, args.timeout, args.retries,
+                              max_workers=args.transcription_workers,
+                              chunks_per_file=args.chunks_per_file,
+                              transcode=args.transcode,
+                              trim_silence=args.trim_silence,
+                              max_sessions=args.session_workers,
+                              max_uploads=args.max_uploads,
+                              preflight=not args.skip_preflight)
+        update_all_session_stats()
         print("\nAudio processing complete!\n")
         
         # Step 2: Process transcripts into slices
         print("Step 2: Processing transcripts into slices...")
-        process_all_transcripts_to_slices(openai_api_key)
+        process_all_transcripts_to_slices(openai_api_key, slice_tokens=args.slice_tokens,
+                                          overlap_tokens=args.overlap_tokens,
+                                          stable=args.stable_slices, clean=args.clean_transcripts,
+                                          overlap_context=args.overlap_context,
+                                          concurrency=args.slice_workers,
+                                          requests_per_minute=args.requests_per_minute,
+                                          tokens_per_minute=args.tokens_per_minute,
+                                          batch=args.batch)
         print("\nSlice processing complete!\n")
         
         # Step 3: Combine slices into session digests
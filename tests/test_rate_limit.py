@@ -0,0 +1,35 @@
+"""Tests for the token-bucket limiter shared by concurrent slice requests."""
+
+import asyncio
+import time
+
+from lib.audio.rate_limit import TokenBucketLimiter
+
+
+async def _acquire_all(limiter: TokenBucketLimiter, count: int, tokens: int = 0) -> None:
+    await asyncio.gather(*(limiter.acquire(tokens) for _ in range(count)))
+
+
+def test_limiter_is_shared_across_event_loops():
+    # Two summarizers sharing a limiter each run it on their own event loop
+    limiter = TokenBucketLimiter(requests_per_minute=600)
+    first_loop = asyncio.new_event_loop()
+    second_loop = asyncio.new_event_loop()
+    try:
+        # Requests queue on the lock once the burst has emptied the bucket
+        first_loop.run_until_complete(_acquire_all(limiter, 602))
+        started = time.monotonic()
+        second_loop.run_until_complete(_acquire_all(limiter, 2))
+        # The bucket is still empty, so the second loop waits for it to refill
+        assert time.monotonic() - started >= 0.15
+    finally:
+        first_loop.close()
+        second_loop.close()
+
+
+def test_token_budget_holds_back_large_requests():
+    limiter = TokenBucketLimiter(tokens_per_minute=60000)
+    started = time.monotonic()
+    asyncio.run(_acquire_all(limiter, 2, tokens=30500))
+    # The second request needs 1000 tokens more than the bucket has left, a second of refill
+    assert time.monotonic() - started >= 0.9
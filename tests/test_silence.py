@@ -0,0 +1,35 @@
+"""Tests for caching silence trims in the upload cache."""
+
+import pytest
+
+import lib.audio.silence as silence
+
+
+@pytest.fixture
+def detections(tmp_path, monkeypatch):
+    """Record each silence detection run instead of decoding with ffmpeg."""
+    calls = []
+
+    def detect(audio_path, noise_db, min_silence_sec):
+        calls.append((noise_db, min_silence_sec))
+        return []
+
+    monkeypatch.setattr(silence, "UPLOAD_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(silence, "detect_silences", detect)
+    monkeypatch.setattr(silence, "get_audio_duration", lambda audio_path: 600.0)
+    return calls
+
+
+def test_nothing_to_remove_is_cached(detections):
+    assert silence.trim_silence("/audio/a.flac", "hash") == ("/audio/a.flac", None)
+    assert silence.trim_silence("/audio/a.flac", "hash") == ("/audio/a.flac", None)
+    assert detections == [(silence.SILENCE_NOISE_DB, silence.SILENCE_MIN_SEC)]
+
+
+def test_detection_settings_are_part_of_the_cache_key(detections):
+    silence.trim_silence("/audio/a.flac", "hash")
+    silence.trim_silence("/audio/a.flac", "hash", noise_db=-30)
+    silence.trim_silence("/audio/a.flac", "hash", min_silence_sec=10.0)
+    assert detections == [(silence.SILENCE_NOISE_DB, silence.SILENCE_MIN_SEC),
+                          (-30, silence.SILENCE_MIN_SEC),
+                          (silence.SILENCE_NOISE_DB, 10.0)]
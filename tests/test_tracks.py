@@ -0,0 +1,66 @@
+"""Tests for placing the split parts of multi-track recordings on the session timeline."""
+
+import io
+import os
+from types import SimpleNamespace
+
+import pytest
+
+import lib.audio.journal as journal_module
+from lib.audio.analytics import compute_session_stats
+from lib.audio.compilation import write_journal_segment
+from lib.audio.journal import TranscriptionJournal
+from lib.audio.tracks import place_track_parts
+from lib.audio.word_cache import save_word_cache
+
+DATE = "2024-01-01"
+
+# Each player's 20 s track split into 8 s parts, with one word 1 s into every part
+PARTS = [("Alice", 8.0), ("Alice", 8.0), ("Alice", 4.0), ("Bob", 8.0), ("Bob", 8.0), ("Bob", 4.0)]
+
+
+def _response(text: str, start: float, speaker: str) -> SimpleNamespace:
+    word = SimpleNamespace(text=text, start=start, end=start + 0.5, type="word", speaker_id=speaker)
+    return SimpleNamespace(text=text, words=[word], language_code="en")
+
+
+@pytest.fixture
+def split_session(tmp_path, monkeypatch):
+    """Journal of a two-track session whose tracks were split into parts."""
+    monkeypatch.setattr(journal_module, "TRANSCRIPTION_CACHE_DIR", str(tmp_path))
+    audio_files = []
+    part_numbers = {}
+    for player, _ in PARTS:
+        part_numbers[player] = part_numbers.get(player, 0) + 1
+        audio_files.append(f"/audio/240101_1200_{player}_part{part_numbers[player]:02d}.flac")
+
+    journal = TranscriptionJournal(DATE)
+    journal.set_files(audio_files)
+    for i, (audio_file, (player, duration)) in enumerate(zip(audio_files, PARTS)):
+        cache_path = os.path.join(str(tmp_path), f"part{i}.npz")
+        # Alice speaks 1 s into each part, Bob 2 s in
+        save_word_cache(_response(f"{player}{i}", 1.0 if player == "Alice" else 2.0, "speaker_0"), cache_path)
+        journal.update(audio_file, track_set="240101_1200", speaker=player, duration=duration)
+        journal.mark_done(audio_file, cache_path)
+    return journal
+
+
+def test_place_track_parts_lays_parts_end_to_end():
+    offsets, length = place_track_parts(PARTS)
+    assert offsets == [0.0, 8.0, 16.0, 0.0, 8.0, 16.0]
+    assert length == 20.0
+
+
+def test_stats_place_split_parts_like_the_transcript(split_session):
+    stats = compute_session_stats(DATE)
+    assert stats["duration_seconds"] == 20.0
+    assert stats["words"] == 6
+    # One word per part, each on its own place in the timeline
+    starts = sorted(m["start"] for m in stats["longest_monologues"])
+    assert len(set(starts)) == len(starts)
+
+    output = io.StringIO()
+    end = write_journal_segment(output, split_session.segments()[0], 0.0)
+    assert end == 20.0
+    assert "[00:00:17] Alice: Alice2" in output.getvalue()
+    assert "[00:00:18] Bob: Bob5" in output.getvalue()